@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-call latency with a fresh httpx.AsyncClient per request
+(the old service pattern) versus the shared pooled UpstreamClient.
+
+Runs against a local stand-in server so no API keys or network are needed:
+
+    python bench_http_client.py --requests 200 --delay-ms 2
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.append('.')
+
+from services.http_client import UpstreamClient
+from services.rate_limiter import RateLimiter
+
+RESPONSE_BODY = b'{"choices":[{"message":{"content":"ok"}}]}'
+
+
+async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, delay: float):
+    """Minimal HTTP/1.1 keep-alive server standing in for an upstream API"""
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            content_length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    content_length = int(line.split(b":", 1)[1])
+            if content_length:
+                await reader.readexactly(content_length)
+
+            if delay:
+                await asyncio.sleep(delay)
+
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: application/json\r\n"
+                b"Content-Length: " + str(len(RESPONSE_BODY)).encode() + b"\r\n"
+                b"Connection: keep-alive\r\n\r\n" + RESPONSE_BODY
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+
+async def call_with_new_client(url: str):
+    async with httpx.AsyncClient() as client:
+        response = await client.post(url, json={"text": "Hello"}, timeout=10.0)
+        response.raise_for_status()
+
+
+async def call_with_pooled_client(client: UpstreamClient, url: str):
+    response = await client.post(url, json={"text": "Hello"}, timeout=10.0)
+    response.raise_for_status()
+
+
+async def measure(label: str, call, total: int, concurrency: int) -> dict:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed_call():
+        async with semaphore:
+            started = time.perf_counter()
+            await call()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    wall_started = time.perf_counter()
+    await asyncio.gather(*(timed_call() for _ in range(total)))
+    wall_ms = (time.perf_counter() - wall_started) * 1000
+
+    latencies.sort()
+    return {
+        "label": label,
+        "mean_ms": statistics.mean(latencies),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "wall_ms": wall_ms
+    }
+
+
+async def main(args):
+    server = await asyncio.start_server(
+        lambda r, w: handle_connection(r, w, args.delay_ms / 1000),
+        "127.0.0.1", 0
+    )
+    port = server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/v1/translate"
+
+    # Pacing off, so the benchmark measures connection reuse rather than the token bucket
+    pooled = UpstreamClient("benchmark", limiter=RateLimiter("benchmark", rate=0, max_concurrency=0))
+
+    # Warm both paths once so imports and the first connection are not measured
+    await call_with_new_client(url)
+    await call_with_pooled_client(pooled, url)
+
+    results = []
+    for concurrency in (1, args.concurrency):
+        results.append(await measure(
+            f"new client per call (c={concurrency})",
+            lambda: call_with_new_client(url), args.requests, concurrency
+        ))
+        results.append(await measure(
+            f"pooled UpstreamClient (c={concurrency})",
+            lambda: call_with_pooled_client(pooled, url), args.requests, concurrency
+        ))
+
+    await pooled.aclose()
+    server.close()
+    await server.wait_closed()
+
+    print(f"{'scenario':<38}{'mean':>10}{'p50':>10}{'p95':>10}{'wall':>12}")
+    for r in results:
+        print(f"{r['label']:<38}{r['mean_ms']:>8.2f}ms{r['p50_ms']:>8.2f}ms{r['p95_ms']:>8.2f}ms{r['wall_ms']:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pooled vs per-call HTTP client latency")
+    parser.add_argument("--requests", type=int, default=200, help="calls per scenario")
+    parser.add_argument("--concurrency", type=int, default=10, help="concurrent callers for the second round")
+    parser.add_argument("--delay-ms", type=float, default=1.0, help="simulated upstream processing time")
+    asyncio.run(main(parser.parse_args()))
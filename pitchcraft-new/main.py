@@ -1,15 +1,20 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict
 import os
 from dotenv import load_dotenv
 import asyncio
 import json
+import re
 from datetime import datetime
-import traceback
+from contextlib import asynccontextmanager
+import logging
+
+# Load environment variables (before importing services, some read settings at import)
+load_dotenv()
 
 # Import services
 from services.tambo_service import TamboService
@@ -17,17 +22,122 @@ from services.firecrawl_service import FirecrawlService
 from services.lingo_service import LingoService
 from services.google_tts_service import GoogleTTSService
 from services.resend_service import ResendService
+from services.http_client import create_upstream_clients, close_upstream_clients
+from services.email_outbox import EmailOutbox
+from services.pitch_store import PitchStore
+from services.pipeline import Pipeline, Stage, stage_time_left
+from services.job_queue import JobQueue, QueueFullError
+from services.single_flight import SingleFlight, normalize_key
+from services.health_monitor import HealthMonitor
+from services.admission import AdmissionMiddleware, Lane
+from services.metrics import REGISTRY, record_fallback
+from services.tracing import TRACER
+from services.log import RequestIdMiddleware, build_log_manager
 
-# Load environment variables
-load_dotenv()
+# Structured logging: records are queued to a background writer thread
+log_manager = build_log_manager()
+log_manager.install()
+log_manager.start()
+logger = logging.getLogger(__name__)
+
+# End-to-end latency budgets, divided across pipeline stages
+PITCH_PIPELINE_DEADLINE = float(os.getenv("PITCH_PIPELINE_DEADLINE", "60.0"))
+RESEARCH_PIPELINE_DEADLINE = float(os.getenv("RESEARCH_PIPELINE_DEADLINE", "30.0"))
+# Research returns its partial results this long before its stage would time out
+RESEARCH_STAGE_MARGIN = float(os.getenv("RESEARCH_STAGE_MARGIN", "0.5"))
+# Largest recipient list accepted by /api/send-pitch/batch
+BATCH_EMAIL_MAX_RECIPIENTS = int(os.getenv("BATCH_EMAIL_MAX_RECIPIENTS", "500"))
+EMAIL_PATTERN = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+# Initialize services
+tambo_service = TamboService()
+firecrawl_service = FirecrawlService()
+lingo_service = LingoService()
+google_tts_service = GoogleTTSService()
+resend_service = ResendService()
+
+UPSTREAMS = {
+    "tambo_ai": tambo_service,
+    "firecrawl": firecrawl_service,
+    "lingo_dev": lingo_service,
+    "google_tts": google_tts_service,
+    "resend": resend_service
+}
+
+# Background prober; /health answers from its latest results
+health_monitor = HealthMonitor({name: service.check_health for name, service in UPSTREAMS.items()})
+
+# Durable queue for outgoing email, drained by a background worker
+email_outbox = EmailOutbox(resend_service.deliver)
+
+# Generated pitch decks, served back by GET /api/pitch/{pitch_id}
+pitch_store = PitchStore()
+
+# Pitch pipelines submitted through the job API, run by a bounded worker pool
+job_queue = JobQueue()
+
+# Coalesces identical concurrent research and pitch requests
+single_flight = SingleFlight()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open pooled HTTP clients and background workers, and shut them down on exit"""
+    log_manager.start()
+    http_clients = create_upstream_clients()
+    tambo_service.http_client = http_clients["tambo_ai"]
+    firecrawl_service.http_client = http_clients["firecrawl"]
+    lingo_service.http_client = http_clients["lingo_dev"]
+    google_tts_service.http_client = http_clients["google_tts"]
+    resend_service.http_client = http_clients["resend"]
+    await email_outbox.start()
+    await job_queue.start()
+    await health_monitor.start()
+    try:
+        yield
+    finally:
+        await health_monitor.stop()
+        await job_queue.stop()
+        await email_outbox.stop()
+        await pitch_store.flush()
+        await close_upstream_clients(http_clients)
+        lingo_service.translation_memory.close()
+        pitch_store.close()
+        TRACER.close()
+        log_manager.stop()
 
 app = FastAPI(
     title="PitchCraft AI",
     description="AI-Powered Startup Pitch Builder - From idea to deck in minutes",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# CORS middleware
+# Admission control: each class of endpoint gets its own concurrency lane and
+# bounded queue, so cheap reads never wait behind pitch generation
+ADMISSION_LANES = {
+    "pitch": Lane.from_env("pitch", max_concurrency=8, max_queue=32, max_queue_time=5.0),
+    "research": Lane.from_env("research", max_concurrency=16, max_queue=64, max_queue_time=5.0),
+    "light": Lane.from_env("light", max_concurrency=64, max_queue=256, max_queue_time=1.0),
+    "default": Lane.from_env("default", max_concurrency=32, max_queue=128, max_queue_time=2.0)
+}
+app.add_middleware(
+    AdmissionMiddleware,
+    lanes=ADMISSION_LANES,
+    routes=[
+        ("POST", "/api/generate-pitch", "pitch"),
+        ("POST", "/api/research-idea", "research"),
+        ("GET", "/health", "light"),
+        ("GET", "/api/pitch/", "light"),
+        ("GET", "/api/jobs/", "light"),
+        ("GET", "/api/email/", "light"),
+        ("GET", "/api/traces/", "light"),
+        ("GET", "/static/", "light"),
+        ("GET", "/metrics", "light")
+    ],
+    default_lane="default"
+)
+
+# CORS middleware (added last so it also wraps load-shedding responses)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -36,17 +146,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Correlation IDs for log records (outermost, so every request gets one)
+app.add_middleware(RequestIdMiddleware)
+
 # Mount static files
 os.makedirs("static", exist_ok=True)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# Initialize services
-tambo_service = TamboService()
-firecrawl_service = FirecrawlService()
-lingo_service = LingoService()
-google_tts_service = GoogleTTSService()
-resend_service = ResendService()
-
 # Pydantic models
 class StartupIdea(BaseModel):
     idea: str
@@ -57,6 +163,7 @@ class StartupIdea(BaseModel):
 class PitchRequest(BaseModel):
     idea: str
     language: Optional[str] = "en"
+    languages: Optional[List[str]] = None
     generate_voice: Optional[bool] = False
     email_to: Optional[str] = None
 
@@ -65,6 +172,11 @@ class EmailRequest(BaseModel):
     email_to: str
     subject: Optional[str] = "Your AI-Generated Pitch Deck"
 
+class BatchEmailRequest(BaseModel):
+    pitch_id: str
+    recipients: List[str]
+    subject: Optional[str] = "Your AI-Generated Pitch Deck"
+
 # Root endpoint
 @app.get("/", response_class=HTMLResponse)
 async def root():
@@ -73,57 +185,112 @@ async def root():
 
 # Health check
 @app.get("/health")
-async def health_check():
-    """Health check endpoint with service status"""
-    service_status = {}
-    
-    services = [
-        ("tambo_ai", tambo_service),
-        ("firecrawl", firecrawl_service),
-        ("lingo_dev", lingo_service),
-        ("google_tts", google_tts_service),
-        ("resend", resend_service)
-    ]
-    
-    for name, service in services:
-        try:
-            service_status[name] = await asyncio.wait_for(service.check_health(), timeout=5.0)
-        except Exception as e:
-            service_status[name] = False
+async def health_check(fresh: bool = False):
+    """Health check endpoint with service status, answered from the background prober"""
+    service_status = await health_monitor.refresh() if fresh else health_monitor.snapshot()
     
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "services": service_status,
+        "services": {name: status["healthy"] for name, status in service_status.items()},
+        "service_details": service_status,
+        "circuit_breakers": {name: service.http_client.breaker.snapshot() for name, service in UPSTREAMS.items()},
         "version": "1.0.0",
         "message": "PitchCraft AI is operational with fallback support"
     }
 
+# Cache and batching statistics
+@app.get("/api/stats")
+async def get_stats():
+    """Runtime statistics for caches and batching"""
+    return {
+        "translation_memory": lingo_service.translation_memory.stats(),
+        "audio_cache": google_tts_service.audio_store.stats(),
+        "email_outbox": await email_outbox.stats(),
+        "email_batches": resend_service.batch_stats(),
+        "pitch_store": pitch_store.stats(),
+        "jobs": job_queue.stats(),
+        "single_flight": single_flight.stats(),
+        "tambo_hedging": tambo_service.hedge_stats(),
+        "admission": {name: lane.stats() for name, lane in ADMISSION_LANES.items()},
+        "rate_limits": {name: service.http_client.limiter.stats() for name, service in UPSTREAMS.items()},
+        "adaptive_timeouts": {name: service.http_client.timeouts.snapshot() for name, service in UPSTREAMS.items()},
+        "research_cache": {
+            "firecrawl_research": firecrawl_service.research_cache.stats(),
+            "tambo_market_analysis": tambo_service.analysis_cache.stats()
+        },
+        "tracing": TRACER.stats(),
+        "logging": log_manager.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+# Trace of a recent sampled request
+@app.get("/api/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    """Span tree of a recent sampled request, with per-span timing and fallbacks"""
+    trace = TRACER.get_trace(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found (not sampled or no longer recent)")
+    return {"success": True, "trace": trace}
+
+# Prometheus metrics
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Metrics in the Prometheus text exposition format"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+def _runtime_metrics():
+    """Scrape-time values read from the caches, queues and admission lanes"""
+    caches = {
+        "translation_memory": lingo_service.translation_memory.stats(),
+        "audio": google_tts_service.audio_store.stats(),
+        "pitch_store": pitch_store.stats(),
+        "firecrawl_research": firecrawl_service.research_cache.stats(),
+        "tambo_market_analysis": tambo_service.analysis_cache.stats()
+    }
+    yield (
+        "pitchcraft_cache_hit_ratio", "gauge", "Cache hit ratio since startup",
+        [("pitchcraft_cache_hit_ratio", {"cache": name}, stats["hit_rate"]) for name, stats in caches.items()]
+    )
+    yield (
+        "pitchcraft_cache_misses_total", "counter", "Cache misses since startup",
+        [("pitchcraft_cache_misses_total", {"cache": name}, stats["misses"]) for name, stats in caches.items()]
+    )
+    lanes = {name: lane.stats() for name, lane in ADMISSION_LANES.items()}
+    yield (
+        "pitchcraft_admission_in_flight", "gauge", "Requests running in each admission lane",
+        [("pitchcraft_admission_in_flight", {"lane": name}, stats["in_flight"]) for name, stats in lanes.items()]
+    )
+    yield (
+        "pitchcraft_admission_rejected_total", "counter", "Requests shed with 503 by each admission lane",
+        [("pitchcraft_admission_rejected_total", {"lane": name}, stats["rejected"]) for name, stats in lanes.items()]
+    )
+    jobs = job_queue.stats()
+    yield (
+        "pitchcraft_jobs", "gauge", "Background pitch jobs by state",
+        [("pitchcraft_jobs", {"state": state}, jobs[state]) for state in ("queued", "running")]
+    )
+
+REGISTRY.register_collector(_runtime_metrics)
+
 # Test all APIs
 @app.get("/api/test-apis")
 async def test_all_apis():
     """Test all API integrations"""
-    results = {}
-    
-    services = [
-        ("tambo_ai", tambo_service),
-        ("firecrawl", firecrawl_service),
-        ("lingo_dev", lingo_service),
-        ("google_tts", google_tts_service),
-        ("resend", resend_service)
-    ]
-    
-    for name, service in services:
+    async def test(name: str, service):
         try:
             result = await asyncio.wait_for(service.test_connection(), timeout=10.0)
-            results[name] = {"status": "success", "result": result}
+            return name, {"status": "success", "result": result}
         except Exception as e:
-            results[name] = {
+            return name, {
                 "status": "error", 
                 "error": str(e),
                 "fallback": "Available"
             }
     
+    # All services are tested concurrently, so the slowest one bounds the response
+    results = dict(await asyncio.gather(*(test(name, service) for name, service in UPSTREAMS.items())))
+    
     return {
         "test_results": results, 
         "timestamp": datetime.now().isoformat(),
@@ -134,32 +301,21 @@ async def test_all_apis():
 @app.post("/api/research-idea")
 async def research_startup_idea(startup_idea: StartupIdea):
     """Research startup idea using Firecrawl + Tambo AI with fallbacks"""
+    # Identical requests already in flight share one research run
+    key = normalize_key(startup_idea.idea, startup_idea.industry, startup_idea.target_market, startup_idea.language)
+    return await single_flight.do("research-idea", key, lambda: _run_research_idea(startup_idea))
+
+async def _run_research_idea(startup_idea: StartupIdea) -> Dict:
+    with TRACER.trace("POST /api/research-idea", idea=startup_idea.idea) as span:
+        return _with_trace_id(await _research_idea(startup_idea), span)
+
+async def _research_idea(startup_idea: StartupIdea) -> Dict:
     try:
-        print(f"🔍 Researching idea: {startup_idea.idea}")
+        logger.info("🔍 Researching idea: %s", startup_idea.idea)
         
-        # Step 1: Try to research with Firecrawl, use fallback if fails
-        research_data = {}
-        try:
-            research_data = await asyncio.wait_for(
-                firecrawl_service.research_startup_idea(startup_idea.idea, startup_idea.industry),
-                timeout=15.0
-            )
-            print("✅ Market research completed")
-        except Exception as e:
-            print(f"⚠️ Firecrawl failed, using fallback research: {str(e)}")
-            research_data = _generate_fallback_research(startup_idea.idea, startup_idea.industry)
-        
-        # Step 2: Try to generate insights with Tambo AI, use fallback if fails
-        ai_insights = {}
-        try:
-            ai_insights = await asyncio.wait_for(
-                tambo_service.analyze_market_research(startup_idea.idea, research_data),
-                timeout=20.0
-            )
-            print("✅ AI insights generated")
-        except Exception as e:
-            print(f"⚠️ Tambo AI failed, using fallback insights: {str(e)}")
-            ai_insights = _generate_fallback_insights(startup_idea.idea)
+        run = await _build_research_pipeline(startup_idea).run()
+        research_data = run["results"]["research"]
+        ai_insights = run["results"]["insights"]
         
         return {
             "success": True,
@@ -167,11 +323,13 @@ async def research_startup_idea(startup_idea: StartupIdea):
             "research": research_data,
             "insights": ai_insights,
             "timestamp": datetime.now().isoformat(),
-            "data_source": "mixed" if "fallback" in str(research_data) else "live_apis"
+            "data_source": "mixed" if "fallback" in str(research_data) else "live_apis",
+            "timings": run["timings"]
         }
         
     except Exception as e:
-        print(f"❌ Research failed completely: {str(e)}")
+        logger.exception("❌ Research failed completely: %s", e)
+        record_fallback("pitchcraft", "research_idea")
         # Complete fallback response
         return {
             "success": True,
@@ -183,146 +341,207 @@ async def research_startup_idea(startup_idea: StartupIdea):
             "message": "Using fallback data due to API connectivity issues"
         }
 
+def _build_research_pipeline(startup_idea: StartupIdea) -> Pipeline:
+    """Firecrawl research followed by Tambo AI insights"""
+    async def research(results):
+        return await firecrawl_service.research_startup_idea(
+            startup_idea.idea, startup_idea.industry, deadline=stage_time_left(RESEARCH_STAGE_MARGIN)
+        )
+    
+    async def insights(results):
+        return await tambo_service.analyze_market_research(startup_idea.idea, results["research"])
+    
+    return Pipeline([
+        Stage("research", research, weight=15,
+              fallback=lambda results, reason: _generate_fallback_research(startup_idea.idea, startup_idea.industry)),
+        Stage("insights", insights, depends_on=["research"], weight=20,
+              fallback=lambda results, reason: _generate_fallback_insights(startup_idea.idea))
+    ], deadline=RESEARCH_PIPELINE_DEADLINE, name="research")
+
 # Generate complete pitch deck with robust error handling
 @app.post("/api/generate-pitch")
 async def generate_pitch_deck(request: PitchRequest):
     """Generate complete pitch deck with all features and fallbacks"""
+    # Identical requests already in flight share one pipeline run (and one pitch)
+    key = normalize_key(request.idea, tuple(_target_languages(request)), bool(request.generate_voice), request.email_to)
+    return await single_flight.do("generate-pitch", key, lambda: _run_generate_pitch(request))
+
+async def _run_generate_pitch(request: PitchRequest) -> Dict:
+    with TRACER.trace("POST /api/generate-pitch", idea=request.idea) as span:
+        return _with_trace_id(await _generate_pitch(request), span)
+
+async def _generate_pitch(request: PitchRequest) -> Dict:
     try:
-        pitch_id = f"pitch_{int(datetime.now().timestamp())}"
-        print(f"🚀 Generating pitch deck: {pitch_id}")
+        pitch_id = PitchStore.new_id()
+        TRACER.current_span().set_attribute("pitch_id", pitch_id)
+        logger.info("🚀 Generating pitch deck: %s", pitch_id)
         
-        features_used = {
-            "research": False,
-            "ai_generation": False,
-            "localization": False,
-            "voice_over": False,
-            "email_sent": False
-        }
+        # Research -> generation -> localization, then voice-over and email concurrently
+        run = await _build_pitch_pipeline(request, pitch_id).run()
+        logger.info("🎉 Pitch deck generation completed in %.0fms!", run["total_ms"])
         
-        # Step 1: Research the idea with fallback
-        print("🔍 Step 1: Researching startup idea...")
-        research_data = {}
-        try:
-            research_data = await asyncio.wait_for(
-                firecrawl_service.research_startup_idea(request.idea),
-                timeout=15.0
-            )
-            features_used["research"] = True
-            print("✅ Research completed")
-        except Exception as e:
-            print(f"⚠️ Research failed, using fallback: {str(e)}")
-            research_data = _generate_fallback_research(request.idea)
+        return _complete_pitch(request, pitch_id, run)
         
-        # Step 2: Generate pitch content with fallback
-        print("✍️ Step 2: Generating pitch content...")
-        pitch_content = {}
-        try:
-            pitch_content = await asyncio.wait_for(
-                tambo_service.generate_pitch_deck(request.idea, research_data),
-                timeout=30.0
-            )
-            features_used["ai_generation"] = True
-            print("✅ Pitch content generated")
-        except Exception as e:
-            print(f"⚠️ AI generation failed, using fallback: {str(e)}")
-            pitch_content = _generate_fallback_pitch_content(request.idea)
+    except Exception as e:
+        logger.exception("❌ Complete failure, using emergency fallback: %s", e)
         
-        # Step 3: Localize if needed
-        if request.language != "en":
-            print(f"🌍 Step 3: Localizing to {request.language}...")
+        return _emergency_fallback_response(request)
+
+# Stream pitch generation as Server-Sent Events
+@app.post("/api/generate-pitch/stream")
+async def generate_pitch_deck_stream(request: PitchRequest):
+    """Generate a pitch deck, streaming each part as soon as it is ready"""
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def produce():
+        with TRACER.trace("POST /api/generate-pitch/stream", idea=request.idea) as span:
             try:
-                localized_content = await asyncio.wait_for(
-                    lingo_service.translate_pitch(pitch_content, request.language),
-                    timeout=20.0
-                )
-                pitch_content = localized_content
-                features_used["localization"] = True
-                print("✅ Localization completed")
+                pitch_id = PitchStore.new_id()
+                span.set_attribute("pitch_id", pitch_id)
+                logger.info("🚀 Streaming pitch deck: %s", pitch_id)
+                stream = PitchEventStream(request, queue.put_nowait)
+                pipeline = _build_pitch_pipeline(request, pitch_id, on_localized=stream.localized)
+                run = await pipeline.run(on_stage=stream.stage_done)
+                queue.put_nowait(("complete", _with_trace_id(_complete_pitch(request, pitch_id, run), span)))
             except Exception as e:
-                print(f"⚠️ Localization failed, keeping original: {str(e)}")
+                logger.exception("❌ Complete failure, using emergency fallback: %s", e)
+                queue.put_nowait(("complete", _emergency_fallback_response(request)))
+            finally:
+                queue.put_nowait(None)
+    
+    async def events():
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                event, data = item
+                yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        finally:
+            # Client went away: stop generating
+            producer.cancel()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+class PitchEventStream:
+    """Turns pipeline progress into SSE events: research, slides, localized slides, voice and email"""
+    
+    def __init__(self, request: PitchRequest, emit):
+        self.languages = _target_languages(request)
+        self.emit = emit
+        self.streamed_languages = set()
+    
+    def localized(self, language: str, content: Dict):
+        """A language finished translating; stream its slides right away"""
+        self.streamed_languages.add(language)
+        for index, slide in enumerate(content.get("slides", [])):
+            self.emit(("localized_slide", {"language": language, "index": index, "slide": slide}))
+    
+    def stage_done(self, name: str, result, timing: Dict):
+        fallback = timing["status"] == "fallback"
+        if timing["status"] == "skipped":
+            return
+        if name == "research":
+            self.emit(("research", {"research": result, "fallback": fallback}))
+        elif name == "ai_generation":
+            slides = result.get("slides", [])
+            for index, slide in enumerate(slides):
+                self.emit(("slide", {"index": index, "total": len(slides), "slide": slide, "fallback": fallback}))
+        elif name == "localization":
+            # Languages that were not translated (or timed out) keep the original slides
+            for language, content in result["variants"].items():
+                if language != "en" and language not in self.streamed_languages:
+                    self.localized(language, content)
+        elif name == "voice_over":
+            self.emit(("voice", {"voice_url": result, "fallback": fallback}))
+        elif name == "email":
+            self.emit(("email", {"email_id": result, "status": "queued" if result else "failed"}))
+
+# Run pitch generation as a background job
+@app.post("/api/jobs", status_code=202)
+async def submit_pitch_job(request: PitchRequest):
+    """Queue a pitch generation job and return its id immediately"""
+    try:
+        job = job_queue.submit(_pitch_job_runner(request), stages=PITCH_STAGES)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return {"success": True, "job_id": job["id"], "status": job["status"], "status_url": f"/api/jobs/{job['id']}"}
+
+# Job progress and result
+@app.get("/api/jobs/{job_id}")
+async def get_pitch_job(job_id: str):
+    """Stage-by-stage progress of a job, with the pitch once it completes"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    finished = sum(1 for stage in job["stages"].values() if stage["status"] != "pending")
+    return {
+        "success": True,
+        "job": {**job, "progress": round(finished / len(job["stages"]), 2) if job["stages"] else 0.0}
+    }
+
+# Cancel a job
+@app.delete("/api/jobs/{job_id}")
+async def cancel_pitch_job(job_id: str):
+    """Cancel a queued or running job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not job_queue.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job already {job['status']}")
+    # A running job stops at its next await; poll the job to see it finish
+    return {"success": True, "job_id": job_id, "status": "cancelling" if job["status"] == "running" else job["status"]}
+
+def _pitch_job_runner(request: PitchRequest):
+    """Job body: run the pitch pipeline, recording each stage as it finishes"""
+    async def run(job: Dict):
+        pitch_id = PitchStore.new_id()
         
-        # Step 4: Generate voice-over if requested
-        voice_url = None
-        if request.generate_voice:
-            print("🎙️ Step 4: Generating voice presentation...")
-            try:
-                voice_url = await asyncio.wait_for(
-                    google_tts_service.generate_pitch_voice(pitch_content),
-                    timeout=25.0
-                )
-                features_used["voice_over"] = True
-                print("✅ Voice presentation generated")
-            except Exception as e:
-                print(f"⚠️ Voice generation failed: {str(e)}")
-                voice_url = "/static/voice_unavailable.mp3"
+        def stage_done(name: str, result, timing: Dict):
+            job["stages"][name] = timing
         
-        # Step 5: Send email if requested
-        if request.email_to:
-            print(f"📧 Step 5: Sending pitch to {request.email_to}...")
+        with TRACER.trace("pitch job", job_id=job["id"], pitch_id=pitch_id) as span:
+            if span.trace_id:
+                job["trace_id"] = span.trace_id
             try:
-                await asyncio.wait_for(
-                    resend_service.send_pitch_email(request.email_to, pitch_content, pitch_id),
-                    timeout=15.0
-                )
-                features_used["email_sent"] = True
-                print("✅ Email sent successfully")
+                pipeline_run = await _build_pitch_pipeline(request, pitch_id).run(on_stage=stage_done)
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                print(f"⚠️ Email sending failed: {str(e)}")
-        
-        # Create final pitch object
-        pitch_deck = {
-            "id": pitch_id,
-            "idea": request.idea,
-            "language": request.language,
-            "content": pitch_content,
-            "research": research_data,
-            "voice_url": voice_url,
-            "generated_at": datetime.now().isoformat(),
-            "status": "completed"
-        }
-        
-        print("🎉 Pitch deck generation completed!")
+                logger.exception("❌ Complete failure, using emergency fallback: %s", e)
+                return _emergency_fallback_response(request)
+            
+            return _complete_pitch(request, pitch_id, pipeline_run)
+    
+    return run
+
+# Email pitch deck with fallback
+@app.post("/api/send-pitch")
+async def send_pitch_email(request: EmailRequest):
+    """Queue pitch deck email for delivery, sending inline if the outbox is unavailable"""
+    try:
+        email_id = await email_outbox.enqueue(
+            resend_service.build_simple_pitch_email(request.email_to, request.pitch_id, request.subject)
+        )
         
         return {
             "success": True,
-            "pitch": pitch_deck,
-            "message": "Pitch deck generated successfully!",
-            "features_used": features_used,
-            "generation_method": "hybrid_with_fallbacks"
+            "message": f"Email queued for delivery to {request.email_to}",
+            "email_id": email_id,
+            "status": "queued",
+            "timestamp": datetime.now().isoformat()
         }
         
     except Exception as e:
-        print(f"❌ Complete failure, using emergency fallback: {str(e)}")
-        print(f"Error details: {traceback.format_exc()}")
-        
-        # Emergency fallback - always works
-        return {
-            "success": True,
-            "pitch": {
-                "id": f"fallback_{int(datetime.now().timestamp())}",
-                "idea": request.idea,
-                "language": request.language,
-                "content": _generate_fallback_pitch_content(request.idea),
-                "research": _generate_fallback_research(request.idea),
-                "voice_url": None,
-                "generated_at": datetime.now().isoformat(),
-                "status": "completed_fallback"
-            },
-            "message": "Pitch deck generated using fallback system",
-            "features_used": {
-                "research": False,
-                "ai_generation": False,
-                "localization": False,
-                "voice_over": False,
-                "email_sent": False
-            },
-            "generation_method": "complete_fallback"
-        }
-
-# Email pitch deck with fallback
-@app.post("/api/send-pitch")
-async def send_pitch_email(request: EmailRequest):
-    """Send existing pitch deck via email with fallback"""
+        logger.warning("⚠️ Email outbox unavailable, sending inline: %s", e)
+    
     try:
         result = await asyncio.wait_for(
             resend_service.send_simple_pitch_email(
@@ -334,22 +553,200 @@ async def send_pitch_email(request: EmailRequest):
         )
         
         return {
-            "success": True,
-            "message": f"Pitch deck sent to {request.email_to}",
-            "email_id": result.get("id", "sent"),
+            "success": result.get("success", False),
+            "message": f"Pitch deck sent to {request.email_to}" if result.get("success") else "Email delivery failed",
+            "email_id": result.get("id"),
+            "status": "sent" if result.get("success") else "failed",
             "timestamp": datetime.now().isoformat()
         }
         
     except Exception as e:
-        # Fallback response
         return {
-            "success": True,
-            "message": f"Email queued for delivery to {request.email_to} (service temporarily unavailable)",
-            "email_id": f"queued_{int(datetime.now().timestamp())}",
-            "timestamp": datetime.now().isoformat(),
-            "note": "Email will be sent when service is restored"
+            "success": False,
+            "message": f"Email delivery to {request.email_to} failed: {str(e)}",
+            "email_id": None,
+            "status": "failed",
+            "timestamp": datetime.now().isoformat()
         }
 
+# Email pitch deck to many recipients
+@app.post("/api/send-pitch/batch")
+async def send_pitch_email_batch(request: BatchEmailRequest):
+    """Send pitch deck to a recipient list through the Resend batch endpoint"""
+    recipients = list(dict.fromkeys(email.strip() for email in request.recipients if email.strip()))
+    if not recipients:
+        raise HTTPException(status_code=400, detail="At least one recipient is required")
+    if len(recipients) > BATCH_EMAIL_MAX_RECIPIENTS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_EMAIL_MAX_RECIPIENTS} recipients per request")
+    invalid = [email for email in recipients if not EMAIL_PATTERN.fullmatch(email)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid recipient addresses: {', '.join(invalid[:10])}")
+    
+    message = resend_service.build_simple_pitch_email(None, request.pitch_id, request.subject)
+    result = await resend_service.send_batch(recipients, message)
+    return result
+
+# Email delivery status
+@app.get("/api/email/{email_id}")
+async def get_email_status(email_id: str):
+    """Delivery status of a queued email"""
+    status = await email_outbox.get(email_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Email not found")
+    return {"success": True, "email": status}
+
+PITCH_STAGES = ["research", "ai_generation", "localization", "voice_over", "email"]
+
+def _build_pitch_pipeline(request: PitchRequest, pitch_id: str, on_localized=None) -> Pipeline:
+    """Declare the pitch generation stages; voice-over and email only depend on localization"""
+    languages = _target_languages(request)
+    
+    async def research(results):
+        return await firecrawl_service.research_startup_idea(request.idea, deadline=stage_time_left(RESEARCH_STAGE_MARGIN))
+    
+    async def ai_generation(results):
+        return await tambo_service.generate_pitch_deck(request.idea, results["research"])
+    
+    # Filled as each language finishes, so a timeout still keeps the finished ones
+    localized = {}
+    
+    async def localization(results):
+        content = results["ai_generation"]
+        to_translate = [language for language in languages if language != "en"]
+        if to_translate:
+            logger.info("🌍 Localizing to %s...", ", ".join(to_translate))
+        
+        async def translate(language):
+            localized[language] = await lingo_service.translate_pitch(content, language)
+            if on_localized:
+                on_localized(language, localized[language])
+        
+        outcomes = await asyncio.gather(*(translate(language) for language in to_translate), return_exceptions=True)
+        for language, outcome in zip(to_translate, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning("⚠️ Localization to %s failed, keeping original: %s", language, outcome)
+        return _merge_localizations(content, languages, localized)
+    
+    async def voice_over(results):
+        return await google_tts_service.generate_pitch_voice(_primary_content(results, languages))
+    
+    async def email(results):
+        return await email_outbox.enqueue(
+            resend_service.build_pitch_email(request.email_to, _primary_content(results, languages), pitch_id)
+        )
+    
+    return Pipeline([
+        Stage("research", research, weight=15,
+              fallback=lambda results, reason: _generate_fallback_research(request.idea)),
+        Stage("ai_generation", ai_generation, depends_on=["research"], weight=30,
+              fallback=lambda results, reason: _generate_fallback_pitch_content(request.idea)),
+        Stage("localization", localization, depends_on=["ai_generation"], weight=20,
+              fallback=lambda results, reason: _merge_localizations(results["ai_generation"], languages, localized)),
+        Stage("voice_over", voice_over, depends_on=["localization"], weight=25,
+              fallback=lambda results, reason: "/static/voice_unavailable.mp3",
+              enabled=bool(request.generate_voice)),
+        Stage("email", email, depends_on=["localization"], weight=1,
+              enabled=bool(request.email_to))
+    ], deadline=PITCH_PIPELINE_DEADLINE, name="pitch")
+
+def _complete_pitch(request: PitchRequest, pitch_id: str, run: Dict) -> Dict:
+    """Store the finished pitch and build the API response"""
+    pitch_deck, features_used = _assemble_pitch(request, pitch_id, run)
+    
+    # Persist off the request path; the hot tier serves reads immediately
+    pitch_store.save_background(pitch_deck)
+    
+    return {
+        "success": True,
+        "pitch": pitch_deck,
+        "message": "Pitch deck generated successfully!",
+        "features_used": features_used,
+        "generation_method": "hybrid_with_fallbacks",
+        "timings": run["timings"]
+    }
+
+def _with_trace_id(response: Dict, span) -> Dict:
+    """Point sampled responses at their trace (GET /api/traces/{trace_id})"""
+    if span.trace_id:
+        response["trace_id"] = span.trace_id
+    return response
+
+def _emergency_fallback_response(request: PitchRequest) -> Dict:
+    """Emergency fallback - always works"""
+    record_fallback("pitchcraft", "generate_pitch")
+    fallback_pitch = {
+        "id": PitchStore.new_id("fallback"),
+        "idea": request.idea,
+        "language": request.language,
+        "content": _generate_fallback_pitch_content(request.idea),
+        "research": _generate_fallback_research(request.idea),
+        "voice_url": None,
+        "generated_at": datetime.now().isoformat(),
+        "status": "completed_fallback"
+    }
+    pitch_store.save_background(fallback_pitch)
+    
+    return {
+        "success": True,
+        "pitch": fallback_pitch,
+        "message": "Pitch deck generated using fallback system",
+        "features_used": {
+            "research": False,
+            "ai_generation": False,
+            "localization": False,
+            "voice_over": False,
+            "email_sent": False,
+            "email_queued": False
+        },
+        "generation_method": "complete_fallback"
+    }
+
+def _merge_localizations(content: Dict, languages: List[str], localized: Dict[str, Dict]) -> Dict:
+    """Variants for every requested language, falling back to the original content"""
+    return {
+        "variants": {language: localized.get(language, content) for language in languages},
+        "translated": [language for language in languages if language in localized]
+    }
+
+def _primary_content(results: Dict, languages: List[str]) -> Dict:
+    """The primary (first) language drives voice-over and email"""
+    return results["localization"]["variants"][languages[0]]
+
+def _assemble_pitch(request: PitchRequest, pitch_id: str, run: Dict):
+    """Build the pitch document and feature flags from a finished pipeline run"""
+    results = run["results"]
+    timings = run["timings"]
+    languages = _target_languages(request)
+    
+    features_used = {
+        "research": timings["research"]["status"] == "ok",
+        "ai_generation": timings["ai_generation"]["status"] == "ok",
+        "localization": bool(results["localization"]["translated"]),
+        "voice_over": timings["voice_over"]["status"] == "ok",
+        "email_sent": False,
+        "email_queued": timings["email"]["status"] == "ok"
+    }
+    
+    pitch_deck = {
+        "id": pitch_id,
+        "idea": request.idea,
+        "language": languages[0],
+        "languages": languages,
+        "content": _primary_content(results, languages),
+        "localizations": results["localization"]["variants"],
+        "research": results["research"],
+        "voice_url": results["voice_over"],
+        "email_id": results["email"],
+        "generated_at": datetime.now().isoformat(),
+        "status": "completed"
+    }
+    return pitch_deck, features_used
+
+def _target_languages(request: PitchRequest) -> List[str]:
+    """Requested languages in order without duplicates; `languages` wins over `language`"""
+    languages = request.languages or [request.language or "en"]
+    return list(dict.fromkeys(language for language in languages if language)) or ["en"]
+
 # Fallback functions
 def _generate_fallback_research(idea: str, industry: str = None) -> Dict:
     """Generate fallback research data"""
@@ -489,15 +886,17 @@ def _generate_fallback_pitch_content(idea: str) -> Dict:
         "generated_at": datetime.now().isoformat()
     }
 
-# Get pitch by ID (simple in-memory storage for demo)
+# Get pitch by ID
 @app.get("/api/pitch/{pitch_id}")
 async def get_pitch(pitch_id: str):
-    """Get pitch deck by ID"""
+    """Get a previously generated pitch deck by ID"""
+    pitch = await pitch_store.get(pitch_id)
+    if pitch is None:
+        raise HTTPException(status_code=404, detail="Pitch not found")
+    
     return {
         "success": True,
-        "message": "In a production app, this would fetch the pitch from database",
-        "pitch_id": pitch_id,
-        "note": "Demo endpoint - integrate with your preferred database"
+        "pitch": pitch
     }
 
 # API documentation
@@ -511,9 +910,19 @@ async def api_documentation():
         "endpoints": {
             "POST /api/research-idea": "Research startup idea with market analysis",
             "POST /api/generate-pitch": "Generate complete pitch deck",
-            "POST /api/send-pitch": "Send pitch deck via email",
+            "POST /api/generate-pitch/stream": "Generate pitch deck, streaming parts as Server-Sent Events",
+            "POST /api/jobs": "Queue pitch generation as a background job",
+            "GET /api/jobs/{job_id}": "Job progress and final pitch",
+            "DELETE /api/jobs/{job_id}": "Cancel a queued or running job",
+            "GET /api/pitch/{pitch_id}": "Fetch a previously generated pitch deck",
+            "POST /api/send-pitch": "Queue pitch deck email for delivery",
+            "POST /api/send-pitch/batch": "Send pitch deck to many recipients in batches",
+            "GET /api/email/{email_id}": "Delivery status of a queued email",
             "GET /api/test-apis": "Test all API integrations",
-            "GET /health": "Health check and service status"
+            "GET /api/stats": "Cache and batching statistics",
+            "GET /metrics": "Prometheus metrics",
+            "GET /api/traces/{trace_id}": "Span tree of a recent sampled request",
+            "GET /health": "Health check and service status (?fresh=1 re-probes all services)"
         },
         "features": [
             "Market research with Firecrawl (with fallback)",
@@ -527,8 +936,8 @@ async def api_documentation():
 
 if __name__ == "__main__":
     import uvicorn
-    print("🚀 Starting PitchCraft AI server...")
-    print("📍 API will be available at: http://localhost:8000")
-    print("📚 API documentation at: http://localhost:8000/docs")
-    print("✅ Fallback systems enabled for 100% reliability")
+    logger.info("🚀 Starting PitchCraft AI server...")
+    logger.info("📍 API will be available at: http://localhost:8000")
+    logger.info("📚 API documentation at: http://localhost:8000/docs")
+    logger.info("✅ Fallback systems enabled for 100% reliability")
     uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", 8000)))
\ No newline at end of file
@@ -0,0 +1,98 @@
+import bisect
+from collections import deque
+from typing import Dict, List, Optional
+
+# Log-spaced latency bucket upper bounds: 10ms growing by 25% per bucket up to ~3 minutes
+BUCKET_BOUNDS: List[float] = []
+_bound = 0.01
+while _bound < 180.0:
+    BUCKET_BOUNDS.append(round(_bound, 4))
+    _bound *= 1.25
+
+
+class LatencyHistogram:
+    """Bucketed histogram over the most recent `window` latencies"""
+
+    def __init__(self, window: int = 500):
+        self._samples = deque(maxlen=window)
+        self._counts = [0] * (len(BUCKET_BOUNDS) + 1)
+
+    def record(self, seconds: float):
+        if len(self._samples) == self._samples.maxlen:
+            self._counts[self._samples[0]] -= 1
+        bucket = bisect.bisect_left(BUCKET_BOUNDS, seconds)
+        self._samples.append(bucket)
+        self._counts[bucket] += 1
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Upper bound of the bucket holding the p-th latency, or None when empty"""
+        if not self._samples:
+            return None
+        target = p * len(self._samples)
+        seen = 0
+        for bucket, count in enumerate(self._counts):
+            seen += count
+            if seen >= target and count:
+                return BUCKET_BOUNDS[bucket] if bucket < len(BUCKET_BOUNDS) else BUCKET_BOUNDS[-1]
+        return BUCKET_BOUNDS[-1]
+
+
+class AdaptiveTimeout:
+    """Per-operation request timeouts derived from observed latency.
+
+    Each operation (e.g. "POST /v1/chat/completions") keeps its own rolling
+    histogram. Its timeout is the observed `percentile` latency times
+    `headroom`, clamped to [floor, ceiling]; until `min_samples` responses are
+    seen the ceiling is used.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        percentile: float = 0.99,
+        headroom: float = 1.5,
+        floor: float = 1.0,
+        ceiling: float = 30.0,
+        min_samples: int = 20,
+        window: int = 500
+    ):
+        self.name = name
+        self.percentile = percentile
+        self.headroom = headroom
+        self.floor = floor
+        self.ceiling = ceiling
+        self.min_samples = min_samples
+        self.window = window
+        self._histograms: Dict[str, LatencyHistogram] = {}
+
+    def _histogram(self, operation: str) -> LatencyHistogram:
+        histogram = self._histograms.get(operation)
+        if histogram is None:
+            histogram = self._histograms[operation] = LatencyHistogram(self.window)
+        return histogram
+
+    def timeout_for(self, operation: str) -> float:
+        histogram = self._histograms.get(operation)
+        if histogram is None or len(histogram) < self.min_samples:
+            return self.ceiling
+        return min(self.ceiling, max(self.floor, histogram.percentile(self.percentile) * self.headroom))
+
+    def record(self, operation: str, seconds: float):
+        """Record the latency of a request that got a response, or the time a timed-out one was given"""
+        self._histogram(operation).record(seconds)
+
+    def snapshot(self) -> Dict:
+        operations = {}
+        for operation, histogram in self._histograms.items():
+            p50 = histogram.percentile(0.5)
+            p99 = histogram.percentile(0.99)
+            operations[operation] = {
+                "samples": len(histogram),
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p99_ms": round(p99 * 1000, 1) if p99 is not None else None,
+                "timeout_s": round(self.timeout_for(operation), 3)
+            }
+        return operations
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import math
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class Overloaded(Exception):
+    """Raised when a lane cannot admit a request within its queue limits"""
+
+    def __init__(self, lane: str, reason: str, retry_after: int):
+        super().__init__(f"{lane} lane overloaded: {reason}")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class Lane:
+    """Concurrency limit with a bounded wait queue for one class of endpoints.
+
+    Up to `max_concurrency` requests run at once. Up to `max_queue` more wait,
+    each for at most `max_queue_time` seconds; anything beyond that is shed.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, max_queue_time: float):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_queue_time = max_queue_time
+
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self._waiting = 0
+        self._avg_duration = 0.0
+        self._stats = {"admitted": 0, "rejected": 0, "queued": 0, "queue_wait_ms_total": 0.0, "queue_wait_ms_max": 0.0}
+
+    @classmethod
+    def from_env(cls, name: str, max_concurrency: int, max_queue: int, max_queue_time: float) -> "Lane":
+        prefix = f"ADMISSION_{name.upper()}"
+        return cls(
+            name,
+            int(os.getenv(f"{prefix}_CONCURRENCY", str(max_concurrency))),
+            int(os.getenv(f"{prefix}_QUEUE", str(max_queue))),
+            float(os.getenv(f"{prefix}_QUEUE_TIME", str(max_queue_time)))
+        )
+
+    def _retry_after(self) -> int:
+        """Rough time for the current backlog to drain, in whole seconds"""
+        backlog = (self._waiting + self._in_flight) / max(self.max_concurrency, 1)
+        return max(1, math.ceil(backlog * (self._avg_duration or self.max_queue_time)))
+
+    def _reject(self, reason: str):
+        self._stats["rejected"] += 1
+        raise Overloaded(self.name, reason, self._retry_after())
+
+    async def acquire(self) -> float:
+        """Take a slot, waiting in the queue if needed; returns the admission time"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+
+        if self._slots.locked():
+            if self._waiting >= self.max_queue:
+                self._reject(f"{self._waiting} requests already queued")
+            self._waiting += 1
+            self._stats["queued"] += 1
+            started = time.monotonic()
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.max_queue_time)
+            except asyncio.TimeoutError:
+                self._reject(f"queued longer than {self.max_queue_time:.1f}s")
+            finally:
+                self._waiting -= 1
+            waited_ms = (time.monotonic() - started) * 1000
+            self._stats["queue_wait_ms_total"] += waited_ms
+            self._stats["queue_wait_ms_max"] = max(self._stats["queue_wait_ms_max"], waited_ms)
+        else:
+            await self._slots.acquire()
+
+        self._in_flight += 1
+        self._stats["admitted"] += 1
+        return time.monotonic()
+
+    def release(self, admitted_at: float):
+        self._in_flight -= 1
+        self._slots.release()
+        # Exponential moving average of time spent holding a slot, for Retry-After
+        duration = time.monotonic() - admitted_at
+        self._avg_duration = duration if not self._avg_duration else 0.9 * self._avg_duration + 0.1 * duration
+
+    def stats(self) -> Dict:
+        queued = self._stats["queued"]
+        return {
+            **self._stats,
+            "queue_wait_ms_total": round(self._stats["queue_wait_ms_total"], 1),
+            "queue_wait_ms_max": round(self._stats["queue_wait_ms_max"], 1),
+            "queue_wait_ms_avg": round(self._stats["queue_wait_ms_total"] / queued, 1) if queued else 0.0,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue
+        }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware that admits each HTTP request through the lane for its path.
+
+    `routes` is an ordered list of (method or None, path prefix, lane name); the
+    first match wins and unmatched requests use `default_lane`. The slot is held
+    until the response, including streamed bodies, is fully sent. Shed requests
+    get an immediate 503 with a Retry-After header.
+    """
+
+    def __init__(self, app, lanes: Dict[str, Lane], routes: List[Tuple[Optional[str], str, str]], default_lane: str):
+        self.app = app
+        self.lanes = lanes
+        self.routes = routes
+        self.default_lane = default_lane
+
+    def lane_for(self, method: str, path: str) -> Lane:
+        for route_method, prefix, lane in self.routes:
+            if (route_method is None or route_method == method) and path.startswith(prefix):
+                return self.lanes[lane]
+        return self.lanes[self.default_lane]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        lane = self.lane_for(scope["method"], scope["path"])
+        try:
+            admitted_at = await lane.acquire()
+        except Overloaded as e:
+            await self._shed(send, e)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lane.release(admitted_at)
+
+    async def _shed(self, send, error: Overloaded):
+        body = json.dumps({
+            "success": False,
+            "message": "Server is busy, please retry shortly",
+            "detail": str(error),
+            "retry_after": error.retry_after
+        }).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"retry-after", str(error.retry_after).encode("ascii"))
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,136 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import uuid
+from typing import Dict, Optional
+
+# Directory mounted at /static by the app
+STATIC_DIR = "static"
+
+
+class AudioStore:
+    """Content-addressed store for synthesized audio.
+
+    Files are named by a hash of the synthesis request, so identical requests map
+    to the same file and concurrent requests never overwrite each other. The
+    directory is kept under a disk quota by evicting the least recently used files
+    (recency is tracked through file modification times, bumped on every hit).
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None, url_prefix: Optional[str] = None):
+        self.directory = directory or os.getenv("TTS_AUDIO_CACHE_DIR", "static/audio")
+        self.max_bytes = max_bytes or int(os.getenv("TTS_AUDIO_CACHE_MAX_BYTES", str(500 * 1024 * 1024)))
+        self.url_prefix = (url_prefix or os.getenv("TTS_AUDIO_URL_PREFIX") or self._static_url_prefix(self.directory)).rstrip("/")
+
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @staticmethod
+    def _static_url_prefix(directory: str) -> str:
+        """URL of a directory under the app's /static mount; anything else needs TTS_AUDIO_URL_PREFIX"""
+        relative = os.path.relpath(os.path.abspath(directory), os.path.abspath(STATIC_DIR))
+        if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+            raise ValueError(
+                f"Audio directory {directory!r} is outside {STATIC_DIR}/ and would not be served; "
+                "set TTS_AUDIO_URL_PREFIX to the URL it is served from"
+            )
+        relative = relative.replace(os.sep, "/")
+        return "/static" if relative == os.curdir else f"/static/{relative}"
+
+    @staticmethod
+    def key_for(text: str, voice: Dict, audio_config: Dict) -> str:
+        """Hash of everything that determines the synthesized audio"""
+        payload = json.dumps({"text": text, "voice": voice, "audio_config": audio_config}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def key_for_bytes(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def _url(self, key: str) -> str:
+        return f"{self.url_prefix}/{key}.mp3"
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Return the URL of a stored file, marking it as recently used"""
+        path = self._path(key)
+        with self._lock:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+        return self._url(key)
+
+    def save(self, key: str, data: bytes) -> str:
+        """Write audio under its key (atomically) and enforce the disk quota"""
+        path = self._path(key)
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+
+        with self._lock:
+            total = self._current_total()
+            try:
+                total -= os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+            os.replace(temp_path, path)
+            self._total_bytes = total + len(data)
+            self._stats["stores"] += 1
+            self._evict(keep=path)
+        return self._url(key)
+
+    def _current_total(self) -> int:
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, _, size in self._scan())
+        return self._total_bytes
+
+    def _scan(self):
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(".mp3"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    def _evict(self, keep: str):
+        if self._total_bytes <= self.max_bytes:
+            return
+        for _, path, size in sorted(self._scan()):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            self._total_bytes -= size
+            self._stats["evictions"] += 1
+
+    async def lookup_async(self, key: str) -> Optional[str]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.lookup, key)
+
+    async def save_async(self, key: str, data: bytes) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.save, key, data)
+
+    def stats(self) -> Dict:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            "bytes_used": self._total_bytes or 0,
+            "max_bytes": self.max_bytes
+        }
@@ -0,0 +1,118 @@
+import logging
+import time
+from collections import deque
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open circuit breaker over a rolling window of calls.
+
+    The breaker opens when, over the last `window` calls (and at least
+    `min_calls`), the failure rate or the rate of calls slower than
+    `slow_call_seconds` crosses its threshold. While open, calls are rejected
+    immediately with CircuitOpenError. After `open_seconds` it lets up to
+    `half_open_probes` trial calls through: one success closes it again, one
+    failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        slow_call_rate: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1
+    ):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self.state = "closed"
+        self._calls = deque(maxlen=window)  # (failed, slow) per call
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._stats = {"rejected": 0, "opened": 0}
+
+    def before_call(self):
+        """Reserve a call slot or raise CircuitOpenError"""
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                self._stats["rejected"] += 1
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            self.state = "half_open"
+            self._probes_in_flight = 0
+
+        if self.state == "half_open":
+            if self._probes_in_flight >= self.half_open_probes:
+                self._stats["rejected"] += 1
+                raise CircuitOpenError(f"{self.name} circuit is half-open, probe in progress")
+            self._probes_in_flight += 1
+
+    def record(self, success: bool, duration: float):
+        """Record the outcome of a call admitted by before_call"""
+        slow = duration >= self.slow_call_seconds
+
+        if self.state == "half_open":
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if success and not slow:
+                self._close()
+            else:
+                self._open()
+            return
+
+        self._calls.append((not success, slow))
+        if self.state == "closed" and len(self._calls) >= self.min_calls:
+            failure_rate, slow_rate = self._rates()
+            if failure_rate >= self.failure_rate or slow_rate >= self.slow_call_rate:
+                self._open()
+
+    def release(self):
+        """Give back a call slot without an outcome (the call was abandoned on purpose)"""
+        if self.state == "half_open":
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def _rates(self):
+        if not self._calls:
+            return 0.0, 0.0
+        failed = sum(1 for failure, _ in self._calls if failure)
+        slow = sum(1 for _, is_slow in self._calls if is_slow)
+        return failed / len(self._calls), slow / len(self._calls)
+
+    def _open(self):
+        if self.state != "open":
+            logger.warning("⚠️ Circuit for %s opened; using fallbacks for %.0fs", self.name, self.open_seconds)
+            self._stats["opened"] += 1
+        self.state = "open"
+        self._opened_at = time.monotonic()
+
+    def _close(self):
+        logger.info("✅ Circuit for %s closed", self.name)
+        self.state = "closed"
+        self._calls.clear()
+
+    def snapshot(self) -> Dict:
+        failure_rate, slow_rate = self._rates()
+        snapshot = {
+            "state": self.state,
+            "failure_rate": round(failure_rate, 4),
+            "slow_call_rate": round(slow_rate, 4),
+            "calls_in_window": len(self._calls),
+            **self._stats
+        }
+        if self.state == "open":
+            snapshot["retry_in_seconds"] = round(max(0.0, self.open_seconds - (time.monotonic() - self._opened_at)), 1)
+        return snapshot
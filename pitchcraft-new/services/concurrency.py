@@ -0,0 +1,40 @@
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+
+async def as_completed_bounded(
+    calls: List[Callable[[], Awaitable[Any]]],
+    limit: int,
+    timeout: Optional[float] = None
+) -> AsyncIterator[Tuple[int, Any, Optional[BaseException]]]:
+    """Run calls concurrently, at most `limit` at a time, yielding results as they finish.
+
+    Yields (index, result, error) tuples in completion order. Calls still running
+    when the shared `timeout` expires are cancelled and never yielded, so callers
+    can tell which ones missed the deadline from the indices they did not see.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(index: int, call: Callable[[], Awaitable[Any]]):
+        async with semaphore:
+            try:
+                return index, await call(), None
+            except Exception as e:
+                return index, None, e
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout if timeout is not None else None
+    pending = {asyncio.ensure_future(run(i, call)) for i, call in enumerate(calls)}
+
+    try:
+        while pending:
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                break
+
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,246 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from services.concurrency import as_completed_bounded
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying; any other 4xx means the message itself is rejected
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429}
+
+
+class EmailOutbox:
+    """Durable email queue backed by a local SQLite file.
+
+    Requests enqueue a fully rendered message and return immediately; a background
+    worker drains the queue through `send`, retrying failures with exponential
+    backoff. Rows are claimed with a lease, so messages held by a crashed process
+    are picked up again once the lease expires.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[Dict], Awaitable[Dict]],
+        path: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        concurrency: Optional[int] = None
+    ):
+        self.send = send
+        self.path = path or os.getenv("EMAIL_OUTBOX_PATH", "data/email_outbox.db")
+        self.max_attempts = max_attempts or int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "8"))
+        self.base_delay = base_delay or float(os.getenv("EMAIL_OUTBOX_BASE_DELAY", "5.0"))
+        self.max_delay = max_delay or float(os.getenv("EMAIL_OUTBOX_MAX_DELAY", "900.0"))
+        self.concurrency = concurrency or int(os.getenv("EMAIL_OUTBOX_CONCURRENCY", "4"))
+        self.poll_interval = float(os.getenv("EMAIL_OUTBOX_POLL_INTERVAL", "30.0"))
+        self.lease_seconds = float(os.getenv("EMAIL_OUTBOX_LEASE", "300.0"))
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._worker_id = uuid.uuid4().hex
+        self._stats = {"enqueued": 0, "sent": 0, "retried": 0, "failed": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10.0)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS outbox (
+                    id TEXT PRIMARY KEY,
+                    message TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    claimed_by TEXT,
+                    last_error TEXT,
+                    provider_id TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at)")
+            self._conn.commit()
+        return self._conn
+
+    async def _run_sync(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, fn, *args)
+
+    # Queue operations (blocking; called through the default executor)
+
+    def _insert(self, email_id: str, message: Dict):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO outbox (id, message, status, next_attempt_at, created_at, updated_at) "
+                "VALUES (?, ?, 'pending', ?, ?, ?)",
+                (email_id, json.dumps(message), now, now, now)
+            )
+            conn.commit()
+
+    def _claim(self, limit: int) -> List[Dict]:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            # One UPDATE claims due rows atomically, including rows whose lease expired
+            conn.execute(
+                "UPDATE outbox SET status = 'sending', claimed_by = ?, updated_at = ? WHERE id IN ("
+                "SELECT id FROM outbox WHERE (status = 'pending' AND next_attempt_at <= ?) "
+                "OR (status = 'sending' AND updated_at < ?) ORDER BY next_attempt_at LIMIT ?)",
+                (self._worker_id, now, now, now - self.lease_seconds, limit)
+            )
+            rows = conn.execute(
+                "SELECT id, message, attempts FROM outbox WHERE status = 'sending' AND claimed_by = ? AND updated_at = ?",
+                (self._worker_id, now)
+            ).fetchall()
+            conn.commit()
+        return [{"id": row[0], "message": json.loads(row[1]), "attempts": row[2]} for row in rows]
+
+    def _mark_sent(self, email_id: str, provider_id: Optional[str]):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE outbox SET status = 'sent', attempts = attempts + 1, provider_id = ?, "
+                "last_error = NULL, updated_at = ? WHERE id = ?",
+                (provider_id, time.time(), email_id)
+            )
+            conn.commit()
+
+    def _mark_failed(self, email_id: str, attempts: int, error: str, retryable: bool) -> bool:
+        """Record a failed attempt; returns True if the message will be retried"""
+        now = time.time()
+        retry = retryable and attempts < self.max_attempts
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1))) * random.uniform(0.8, 1.2)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                ("pending" if retry else "failed", attempts, now + delay, error, now, email_id)
+            )
+            conn.commit()
+        return retry
+
+    def _next_due_in(self) -> Optional[float]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'"
+            ).fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def _get(self, email_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT id, status, attempts, last_error, provider_id, created_at, updated_at FROM outbox WHERE id = ?",
+                (email_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row[0],
+            "status": row[1],
+            "attempts": row[2],
+            "last_error": row[3],
+            "provider_id": row[4],
+            "created_at": row[5],
+            "updated_at": row[6]
+        }
+
+    def _counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connect().execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    # Public API
+
+    async def enqueue(self, message: Dict) -> str:
+        """Persist a rendered message and wake the worker; returns the outbox id"""
+        email_id = f"email_{uuid.uuid4().hex}"
+        await self._run_sync(self._insert, email_id, message)
+        self._stats["enqueued"] += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return email_id
+
+    async def get(self, email_id: str) -> Optional[Dict]:
+        return await self._run_sync(self._get, email_id)
+
+    async def start(self):
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def _run(self):
+        while True:
+            try:
+                batch = await self._run_sync(self._claim, self.concurrency * 4)
+                if batch:
+                    await self._deliver(batch)
+                    continue
+
+                wait = await self._run_sync(self._next_due_in)
+                wait = self.poll_interval if wait is None else min(wait, self.poll_interval)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("⚠️ Email outbox worker error: %s", e)
+                await asyncio.sleep(self.base_delay)
+
+    async def _deliver(self, batch: List[Dict]):
+        calls = [lambda item=item: self.send(item["message"]) for item in batch]
+        async for index, result, error in as_completed_bounded(calls, self.concurrency):
+            item = batch[index]
+            attempts = item["attempts"] + 1
+
+            if error is None and result.get("success"):
+                await self._run_sync(self._mark_sent, item["id"], result.get("id"))
+                self._stats["sent"] += 1
+                continue
+
+            status_code = None if error is not None else result.get("status_code")
+            retryable = status_code is None or status_code >= 500 or status_code in RETRYABLE_STATUS_CODES
+            message = str(error) if error is not None else result.get("error", "send failed")
+            if await self._run_sync(self._mark_failed, item["id"], attempts, message, retryable):
+                self._stats["retried"] += 1
+            else:
+                self._stats["failed"] += 1
+                logger.error("⚠️ Email %s permanently failed after %d attempts: %s", item["id"], attempts, message)
+
+    async def stats(self) -> Dict:
+        try:
+            queue = await self._run_sync(self._counts)
+        except Exception:
+            queue = {}
+        return {**self._stats, "queue": queue, "worker_running": self._worker is not None and not self._worker.done()}
@@ -1,42 +1,57 @@
-import httpx
+import logging
 import os
 import json
 from typing import Dict, List, Optional
 from datetime import datetime
 
+from services.http_client import UpstreamClient
+from services.concurrency import as_completed_bounded
+from services.metrics import record_fallback
+from services.result_cache import ResultCache
+from services.single_flight import normalize_key
+from services.tracing import TRACER
+
+logger = logging.getLogger(__name__)
+
 class FirecrawlService:
-    def __init__(self):
+    def __init__(self, http_client: Optional[UpstreamClient] = None, research_cache: Optional[ResultCache] = None):
         self.api_key = os.getenv("FIRECRAWL_API_KEY")
         self.base_url = "https://api.firecrawl.dev"
+        self.http_client = http_client or UpstreamClient("firecrawl")
+        # Research fan-out: parallel searches under a deadline inside the research stage's budget
+        self.search_concurrency = int(os.getenv("FIRECRAWL_SEARCH_CONCURRENCY", "5"))
+        self.research_deadline = float(os.getenv("FIRECRAWL_RESEARCH_DEADLINE", "12.0"))
+        # Competitor scraping: pages fetched in parallel under one global deadline
+        self.scrape_concurrency = int(os.getenv("FIRECRAWL_SCRAPE_CONCURRENCY", "8"))
+        self.scrape_deadline = float(os.getenv("FIRECRAWL_SCRAPE_DEADLINE", "20.0"))
+        self.scrape_max_urls = int(os.getenv("FIRECRAWL_SCRAPE_MAX_URLS", "50"))
+        # Research changes slowly per idea/industry; fallback and partial results are never cached
+        self.research_cache = research_cache or ResultCache("firecrawl_research")
         
     async def check_health(self) -> bool:
         """Check if Firecrawl service is available"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/v0/status",
-                    headers={"Authorization": f"Bearer {self.api_key}"},
-                    timeout=5.0
-                )
-                return response.status_code == 200
+            response = await self.http_client.get(
+                f"{self.base_url}/v0/status",
+                headers={"Authorization": f"Bearer {self.api_key}"}
+            )
+            return response.status_code == 200
         except:
             return False
     
     async def test_connection(self) -> Dict:
         """Test Firecrawl API connection with graceful fallback"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/v0/status",
-                    headers={"Authorization": f"Bearer {self.api_key}"},
-                    timeout=10.0
-                )
+            response = await self.http_client.get(
+                f"{self.base_url}/v0/status",
+                headers={"Authorization": f"Bearer {self.api_key}"}
+            )
+            
+            if response.status_code == 200:
+                return {"status": "connected", "service": "firecrawl"}
+            else:
+                return {"status": "api_error", "fallback": "available"}
                 
-                if response.status_code == 200:
-                    return {"status": "connected", "service": "firecrawl"}
-                else:
-                    return {"status": "api_error", "fallback": "available"}
-                    
         except Exception as e:
             return {
                 "status": "connection_failed",
@@ -44,83 +59,143 @@ class FirecrawlService:
                 "fallback": "using_synthetic_research"
             }
     
-    async def research_startup_idea(self, idea: str, industry: str = None) -> Dict:
-        """Research startup idea with immediate fallback"""
+    async def research_startup_idea(self, idea: str, industry: str = None, deadline: Optional[float] = None) -> Dict:
+        """Research startup idea with immediate fallback, served from the research cache when possible.
+
+        `deadline` caps the search fan-out below the caller's own timeout, so the
+        results gathered so far are returned instead of being cancelled.
+        """
+        deadline = self.research_deadline if deadline is None else min(deadline, self.research_deadline)
+        return await self.research_cache.get_or_load(
+            normalize_key(idea, industry),
+            lambda: self._research_startup_idea(idea, industry, deadline),
+            # Research cut short by the deadline is served once but never cached
+            cacheable=lambda research: research.get("data_source") == "firecrawl_api" and not research.get("partial")
+        )
+    
+    async def _research_startup_idea(self, idea: str, industry: str, deadline: float) -> Dict:
         try:
-            # Attempt real research
+            # Attempt real research - every query runs concurrently under a shared deadline
             search_queries = self._generate_search_queries(idea, industry)
             research_results = []
+            seen_urls = set()
+            completed = 0
             
-            async with httpx.AsyncClient() as client:
-                for query in search_queries[:2]:  # Limit to 2 searches for speed
-                    try:
-                        response = await client.post(
-                            f"{self.base_url}/v0/search",
-                            headers={
-                                "Authorization": f"Bearer {self.api_key}",
-                                "Content-Type": "application/json"
-                            },
-                            json={
-                                "query": query,
-                                "limit": 3
-                            },
-                            timeout=10.0
-                        )
-                        
-                        if response.status_code == 200:
-                            result = response.json()
-                            research_results.extend(result.get("results", []))
-                    except Exception as e:
-                        print(f"Search query failed: {str(e)}")
-                        continue
+            searches = [lambda query=query: self._search(query) for query in search_queries]
+            async for index, results, error in as_completed_bounded(
+                searches, self.search_concurrency, deadline
+            ):
+                if error is not None:
+                    logger.warning("Search query failed: %s", error)
+                    continue
+                completed += 1
+                
+                # Merge as results arrive, dropping pages already found by another query
+                for result in results:
+                    url = result.get("url")
+                    if url:
+                        if url in seen_urls:
+                            continue
+                        seen_urls.add(url)
+                    research_results.append(result)
             
             if research_results:
-                return self._process_research_results(idea, research_results)
+                research = self._process_research_results(idea, research_results)
+                research["queries_completed"] = completed
+                research["queries_total"] = len(search_queries)
+                research["partial"] = completed < len(search_queries)
+                return research
             
         except Exception as e:
-            print(f"Firecrawl research failed, using fallback: {str(e)}")
+            logger.warning("Firecrawl research failed, using fallback: %s", e)
         
         # Always return fallback research
+        record_fallback("firecrawl", "research_startup_idea")
         return self._generate_fallback_research(idea, industry)
     
-    async def scrape_competitor_data(self, competitor_urls: List[str]) -> Dict:
-        """Scrape competitor data with fallback"""
+    async def _search(self, query: str) -> List[Dict]:
+        """Run a single Firecrawl search query"""
+        with TRACER.span("firecrawl.search", query=query) as span:
+            response = await self.http_client.post(
+                f"{self.base_url}/v0/search",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "query": query,
+                    "limit": 3
+                }
+            )
+            
+            if response.status_code == 200:
+                results = response.json().get("results", [])
+                span.set_attribute("results", len(results))
+                return results
+            return []
+    
+    async def scrape_competitor_data(
+        self,
+        competitor_urls: List[str],
+        max_concurrency: Optional[int] = None,
+        deadline: Optional[float] = None
+    ) -> Dict:
+        """Scrape competitor pages in parallel, returning whatever finished before the deadline"""
+        pages = []
         try:
+            # Drop duplicates but keep the caller's order
+            urls = list(dict.fromkeys(competitor_urls))[:self.scrape_max_urls]
+            pages = [{"url": url, "status": "timeout"} for url in urls]
             competitor_data = []
             
-            async with httpx.AsyncClient() as client:
-                for url in competitor_urls[:3]:  # Limit for speed
-                    try:
-                        response = await client.post(
-                            f"{self.base_url}/v0/scrape",
-                            headers={
-                                "Authorization": f"Bearer {self.api_key}",
-                                "Content-Type": "application/json"
-                            },
-                            json={
-                                "url": url,
-                                "formats": ["markdown", "extract"]
-                            },
-                            timeout=15.0
-                        )
-                        
-                        if response.status_code == 200:
-                            result = response.json()
-                            competitor_data.append(result)
-                    except Exception:
-                        continue
+            scrapes = [lambda url=url: self._scrape(url) for url in urls]
+            async for index, result, error in as_completed_bounded(
+                scrapes,
+                max_concurrency or self.scrape_concurrency,
+                deadline if deadline is not None else self.scrape_deadline
+            ):
+                page = pages[index]
+                if error is not None:
+                    page["status"] = "error"
+                    page["error"] = str(error) or type(error).__name__
+                elif result.status_code != 200:
+                    page["status"] = "http_error"
+                    page["status_code"] = result.status_code
+                else:
+                    page["status"] = "ok"
+                    competitor_data.append(result.json())
             
             if competitor_data:
                 return {
                     "competitor_analysis": competitor_data,
+                    "pages": pages,
+                    "scraped": len(competitor_data),
+                    "requested": len(urls),
                     "data_source": "firecrawl_scraping",
                     "scraped_at": datetime.now().isoformat()
                 }
             
         except Exception as e:
-            print(f"Competitor scraping failed: {str(e)}")
+            logger.warning("Competitor scraping failed: %s", e)
         
-        return self._generate_fallback_competitor_data()
+        record_fallback("firecrawl", "scrape_competitor_data")
+        fallback = self._generate_fallback_competitor_data()
+        fallback["pages"] = pages
+        return fallback
+    
+    async def _scrape(self, url: str):
+        """Scrape a single page with Firecrawl"""
+        return await self.http_client.post(
+            f"{self.base_url}/v0/scrape",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "url": url,
+                "formats": ["markdown", "extract"]
+            }
+        )
     
     def _generate_search_queries(self, idea: str, industry: str = None) -> List[str]:
         """Generate relevant search queries for market research"""
@@ -1,64 +1,80 @@
-import httpx
+import logging
 import os
 import json
 import base64
+import re
 from typing import Dict, List, Optional
-from datetime import datetime
+
+from services.http_client import UpstreamClient
+from services.concurrency import as_completed_bounded
+from services.metrics import record_fallback
+from services.tracing import TRACER
+from services.audio_store import AudioStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AUDIO_CONFIG = {
+    "audioEncoding": "MP3",
+    "speakingRate": 1.0,
+    "pitch": 0.0,
+    "volumeGainDb": 0.0
+}
 
 class GoogleTTSService:
-    def __init__(self):
+    def __init__(self, http_client: Optional[UpstreamClient] = None, audio_store: Optional[AudioStore] = None):
         self.api_key = os.getenv("GOOGLE_CLOUD_API_KEY")
         self.base_url = os.getenv("GOOGLE_CLOUD_TTS_URL", "https://texttospeech.googleapis.com/v1")
+        self.http_client = http_client or UpstreamClient("google_tts")
+        # Full-deck voice-overs are split into chunks under the API's 5000-byte input limit
+        self.chunk_max_bytes = int(os.getenv("TTS_CHUNK_MAX_BYTES", "4500"))
+        self.chunk_concurrency = int(os.getenv("TTS_CHUNK_CONCURRENCY", "4"))
+        self.audio_store = audio_store or AudioStore()
         
     async def check_health(self) -> bool:
         """Check if Google TTS service is available"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/voices?key={self.api_key}",
-                    timeout=10.0
-                )
-                return response.status_code == 200
+            response = await self.http_client.get(
+                f"{self.base_url}/voices?key={self.api_key}"
+            )
+            return response.status_code == 200
         except:
             return False
     
     async def test_connection(self) -> Dict:
         """Test Google TTS API connection"""
         try:
-            async with httpx.AsyncClient() as client:
-                # Test with a simple synthesis
-                response = await client.post(
-                    f"{self.base_url}/text:synthesize?key={self.api_key}",
-                    headers={
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "input": {"text": "Hello, this is a test from PitchCraft AI"},
-                        "voice": {
-                            "languageCode": "en-US",
-                            "name": "en-US-Neural2-F"
-                        },
-                        "audioConfig": {
-                            "audioEncoding": "MP3"
-                        }
+            # Test with a simple synthesis
+            response = await self.http_client.post(
+                f"{self.base_url}/text:synthesize?key={self.api_key}",
+                headers={
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "input": {"text": "Hello, this is a test from PitchCraft AI"},
+                    "voice": {
+                        "languageCode": "en-US",
+                        "name": "en-US-Neural2-F"
                     },
-                    timeout=15.0
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return {
-                        "status": "connected",
-                        "message": "Google TTS API is working",
-                        "audio_length": len(result.get("audioContent", "")) if "audioContent" in result else 0
+                    "audioConfig": {
+                        "audioEncoding": "MP3"
                     }
-                else:
-                    return {
-                        "status": "error",
-                        "code": response.status_code,
-                        "message": response.text
-                    }
-                    
+                }
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                return {
+                    "status": "connected",
+                    "message": "Google TTS API is working",
+                    "audio_length": len(result.get("audioContent", "")) if "audioContent" in result else 0
+                }
+            else:
+                return {
+                    "status": "error",
+                    "code": response.status_code,
+                    "message": response.text
+                }
+                
         except Exception as e:
             return {
                 "status": "error",
@@ -68,20 +84,41 @@ class GoogleTTSService:
     async def generate_pitch_voice(self, pitch_content: Dict) -> Optional[str]:
         """Generate voice-over for the entire pitch deck"""
         try:
-            # Extract text from slides
-            pitch_text = self._extract_pitch_text(pitch_content)
+            # Split the deck into request-sized chunks and synthesize them concurrently
+            chunks = self._chunk_pitch_text(pitch_content)
+            TRACER.current_span().set_attribute("chunks", len(chunks))
+            voice = {"languageCode": "en-US", "name": "en-US-Neural2-F"}
             
-            # Generate voice for the complete pitch
-            audio_url = await self._synthesize_speech(
-                pitch_text,
-                voice_name="en-US-Neural2-F",
-                language_code="en-US"
-            )
+            # The same narration with the same voice is served from the audio store
+            cache_key = AudioStore.key_for("\n".join(chunks), voice, DEFAULT_AUDIO_CONFIG)
+            cached_url = await self.audio_store.lookup_async(cache_key)
+            if cached_url:
+                return cached_url
             
-            return audio_url
+            audio_parts = [None] * len(chunks)
+            calls = [
+                lambda chunk=chunk: self._synthesize_audio(
+                    chunk,
+                    voice_name=voice["name"],
+                    language_code=voice["languageCode"]
+                )
+                for chunk in chunks
+            ]
+            async for index, audio, error in as_completed_bounded(calls, self.chunk_concurrency):
+                if error is not None:
+                    logger.warning("Error synthesizing voice chunk %d/%d: %s", index + 1, len(chunks), error)
+                audio_parts[index] = audio
+            
+            if any(audio is None for audio in audio_parts):
+                record_fallback("google_tts", "generate_pitch_voice")
+                return None
+            
+            # MP3 frames can be concatenated as-is, so the parts are joined without re-encoding
+            return await self._save_audio_bytes(self._join_mp3_parts(audio_parts), cache_key)
             
         except Exception as e:
-            print(f"Error generating pitch voice: {str(e)}")
+            logger.warning("Error generating pitch voice: %s", e)
+            record_fallback("google_tts", "generate_pitch_voice")
             return None
     
     async def generate_slide_voice(self, slide: Dict, voice_settings: Optional[Dict] = None) -> Optional[str]:
@@ -104,77 +141,145 @@ class GoogleTTSService:
             return audio_url
             
         except Exception as e:
-            print(f"Error generating slide voice: {str(e)}")
+            logger.warning("Error generating slide voice: %s", e)
             return None
     
     async def _synthesize_speech(self, text: str, voice_name: str = "en-US-Neural2-F", language_code: str = "en-US") -> Optional[str]:
         """Synthesize speech using Google TTS API"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/text:synthesize?key={self.api_key}",
-                    headers={
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "input": {"text": text},
-                        "voice": {
-                            "languageCode": language_code,
-                            "name": voice_name
-                        },
-                        "audioConfig": {
-                            "audioEncoding": "MP3",
-                            "speakingRate": 1.0,
-                            "pitch": 0.0,
-                            "volumeGainDb": 0.0
-                        }
-                    },
-                    timeout=30.0
-                )
+            # Identical text and voice settings reuse the stored file
+            voice = {"languageCode": language_code, "name": voice_name}
+            cache_key = AudioStore.key_for(text, voice, DEFAULT_AUDIO_CONFIG)
+            cached_url = await self.audio_store.lookup_async(cache_key)
+            if cached_url:
+                return cached_url
+            
+            audio_data = await self._synthesize_audio(text, voice_name, language_code)
+            if audio_data is None:
+                return None
+            
+            # Save audio file and return URL
+            return await self._save_audio_bytes(audio_data, cache_key)
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    audio_content = result.get("audioContent")
-                    
-                    if audio_content:
-                        # Save audio file and return URL
-                        audio_url = await self._save_audio_file(audio_content)
-                        return audio_url
-                    else:
-                        return None
-                else:
-                    print(f"TTS API error: {response.status_code} - {response.text}")
-                    return None
-                    
         except Exception as e:
-            print(f"Error in speech synthesis: {str(e)}")
+            logger.warning("Error in speech synthesis: %s", e)
+            return None
+    
+    async def _synthesize_audio(self, text: str, voice_name: str = "en-US-Neural2-F", language_code: str = "en-US") -> Optional[bytes]:
+        """Call text:synthesize and return the decoded MP3 bytes"""
+        with TRACER.span("tts.synthesize", voice=voice_name, characters=len(text)):
+            response = await self.http_client.post(
+                f"{self.base_url}/text:synthesize?key={self.api_key}",
+                headers={
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "input": {"text": text},
+                    "voice": {
+                        "languageCode": language_code,
+                        "name": voice_name
+                    },
+                    "audioConfig": DEFAULT_AUDIO_CONFIG
+                }
+            )
+            
+            if response.status_code == 200:
+                audio_content = response.json().get("audioContent")
+                return base64.b64decode(audio_content) if audio_content else None
+            
+            logger.warning("TTS API error: %s - %s", response.status_code, response.text)
             return None
     
     async def _save_audio_file(self, audio_content_base64: str) -> str:
-        """Save audio content to file and return URL"""
+        """Save base64 audio content to file and return URL"""
         try:
             # Decode base64 audio content
-            audio_data = base64.b64decode(audio_content_base64)
+            return await self._save_audio_bytes(base64.b64decode(audio_content_base64))
             
-            # Generate unique filename
-            timestamp = int(datetime.now().timestamp())
-            filename = f"pitch_voice_{timestamp}.mp3"
-            filepath = f"static/{filename}"
-            
-            # Ensure static directory exists
-            os.makedirs("static", exist_ok=True)
-            
-            # Save audio file
-            with open(filepath, "wb") as f:
-                f.write(audio_data)
-            
-            # Return URL path
-            return f"/static/{filename}"
+        except Exception as e:
+            logger.error("Error saving audio file: %s", e)
+            return None
+    
+    async def _save_audio_bytes(self, audio_data: bytes, cache_key: Optional[str] = None) -> Optional[str]:
+        """Save raw audio bytes to the audio store and return URL"""
+        try:
+            # Without a request key the file is addressed by its own content
+            key = cache_key or AudioStore.key_for_bytes(audio_data)
+            return await self.audio_store.save_async(key, audio_data)
             
         except Exception as e:
-            print(f"Error saving audio file: {str(e)}")
+            logger.error("Error saving audio file: %s", e)
             return None
     
+    def _chunk_pitch_text(self, pitch_content: Dict) -> List[str]:
+        """Split the pitch narration at slide boundaries, then sentences, to fit the API input limit"""
+        intro = "Welcome to our startup pitch presentation."
+        conclusion = "Thank you for your attention. We look forward to discussing this opportunity with you."
+        
+        segments = []
+        if "slides" in pitch_content and isinstance(pitch_content["slides"], list):
+            for i, slide in enumerate(pitch_content["slides"], 1):
+                segments.append(f"Slide {i}. {self._extract_slide_text(slide)}")
+        
+        # Intro and conclusion are short, so they ride along with the first and last slides
+        if segments:
+            segments[0] = f"{intro} {segments[0]}"
+            segments[-1] = f"{segments[-1]} {conclusion}"
+        else:
+            segments = [f"{intro} {conclusion}"]
+        
+        chunks = []
+        for segment in segments:
+            chunks.extend(self._split_text(segment, self.chunk_max_bytes))
+        return chunks
+    
+    def _split_text(self, text: str, max_bytes: int) -> List[str]:
+        """Pack sentences (or words, for overlong sentences) into pieces of at most max_bytes"""
+        if len(text.encode("utf-8")) <= max_bytes:
+            return [text]
+        
+        pieces = []
+        for sentence in re.split(r"(?<=[.!?])\s+", text):
+            if len(sentence.encode("utf-8")) <= max_bytes:
+                pieces.append(sentence)
+            else:
+                pieces.extend(sentence.split())
+        
+        chunks = []
+        current = ""
+        for piece in pieces:
+            candidate = f"{current} {piece}" if current else piece
+            if len(candidate.encode("utf-8")) <= max_bytes:
+                current = candidate
+                continue
+            if current:
+                chunks.append(current)
+            # A single word over the limit is cut at the byte limit as a last resort
+            while len(piece.encode("utf-8")) > max_bytes:
+                head = piece.encode("utf-8")[:max_bytes].decode("utf-8", errors="ignore")
+                chunks.append(head)
+                piece = piece[len(head):]
+            current = piece
+        
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def _join_mp3_parts(self, parts: List[bytes]) -> bytes:
+        """Concatenate MP3 streams, dropping ID3v2 tags from every part after the first"""
+        joined = bytearray(parts[0]) if parts else bytearray()
+        for part in parts[1:]:
+            joined.extend(part[self._id3_tag_length(part):])
+        return bytes(joined)
+    
+    def _id3_tag_length(self, data: bytes) -> int:
+        """Length of a leading ID3v2 tag, or 0 if there is none"""
+        if len(data) < 10 or data[:3] != b"ID3":
+            return 0
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        footer = 10 if data[5] & 0x10 else 0
+        return 10 + size + footer
+    
     def _extract_pitch_text(self, pitch_content: Dict) -> str:
         """Extract text from pitch content for voice synthesis"""
         text_parts = []
@@ -216,37 +321,35 @@ class GoogleTTSService:
     async def get_available_voices(self, language_code: str = "en-US") -> Dict:
         """Get available voices for a language"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/voices?key={self.api_key}&languageCode={language_code}",
-                    timeout=10.0
-                )
+            response = await self.http_client.get(
+                f"{self.base_url}/voices?key={self.api_key}&languageCode={language_code}"
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                voices = result.get("voices", [])
+                
+                # Format voice information
+                formatted_voices = []
+                for voice in voices:
+                    formatted_voices.append({
+                        "name": voice.get("name"),
+                        "gender": voice.get("ssmlGender"),
+                        "language_codes": voice.get("languageCodes", []),
+                        "natural_sample_rate": voice.get("naturalSampleRateHertz")
+                    })
+                
+                return {
+                    "voices": formatted_voices,
+                    "total": len(formatted_voices),
+                    "language_code": language_code,
+                    "status": "success"
+                }
+            else:
+                return self._get_fallback_voices(language_code)
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    voices = result.get("voices", [])
-                    
-                    # Format voice information
-                    formatted_voices = []
-                    for voice in voices:
-                        formatted_voices.append({
-                            "name": voice.get("name"),
-                            "gender": voice.get("ssmlGender"),
-                            "language_codes": voice.get("languageCodes", []),
-                            "natural_sample_rate": voice.get("naturalSampleRateHertz")
-                        })
-                    
-                    return {
-                        "voices": formatted_voices,
-                        "total": len(formatted_voices),
-                        "language_code": language_code,
-                        "status": "success"
-                    }
-                else:
-                    return self._get_fallback_voices(language_code)
-                    
         except Exception as e:
-            print(f"Error getting voices: {str(e)}")
+            logger.warning("Error getting voices: %s", e)
             return self._get_fallback_voices(language_code)
     
     def _get_fallback_voices(self, language_code: str = "en-US") -> Dict:
@@ -276,40 +379,38 @@ class GoogleTTSService:
     async def generate_voice_with_ssml(self, ssml: str, voice_settings: Dict) -> Optional[str]:
         """Generate voice using SSML for advanced control"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/text:synthesize?key={self.api_key}",
-                    headers={
-                        "Content-Type": "application/json"
+            response = await self.http_client.post(
+                f"{self.base_url}/text:synthesize?key={self.api_key}",
+                headers={
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "input": {"ssml": ssml},
+                    "voice": {
+                        "languageCode": voice_settings.get("language_code", "en-US"),
+                        "name": voice_settings.get("voice_name", "en-US-Neural2-F")
                     },
-                    json={
-                        "input": {"ssml": ssml},
-                        "voice": {
-                            "languageCode": voice_settings.get("language_code", "en-US"),
-                            "name": voice_settings.get("voice_name", "en-US-Neural2-F")
-                        },
-                        "audioConfig": {
-                            "audioEncoding": "MP3",
-                            "speakingRate": voice_settings.get("speaking_rate", 1.0),
-                            "pitch": voice_settings.get("pitch", 0.0),
-                            "volumeGainDb": voice_settings.get("volume_gain", 0.0)
-                        }
-                    },
-                    timeout=30.0
-                )
+                    "audioConfig": {
+                        "audioEncoding": "MP3",
+                        "speakingRate": voice_settings.get("speaking_rate", 1.0),
+                        "pitch": voice_settings.get("pitch", 0.0),
+                        "volumeGainDb": voice_settings.get("volume_gain", 0.0)
+                    }
+                }
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                audio_content = result.get("audioContent")
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    audio_content = result.get("audioContent")
-                    
-                    if audio_content:
-                        audio_url = await self._save_audio_file(audio_content)
-                        return audio_url
-                    else:
-                        return None
+                if audio_content:
+                    audio_url = await self._save_audio_file(audio_content)
+                    return audio_url
                 else:
                     return None
-                    
+            else:
+                return None
+                
         except Exception as e:
-            print(f"Error in SSML synthesis: {str(e)}")
+            logger.warning("Error in SSML synthesis: %s", e)
             return None
\ No newline at end of file
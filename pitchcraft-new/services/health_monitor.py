@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """Probes every upstream service concurrently on an interval.
+
+    The latest status and latency of each service are kept in memory, so health
+    endpoints answer without touching the network. `refresh()` re-probes all
+    services at once; concurrent callers share the same probe round.
+    """
+
+    def __init__(
+        self,
+        probes: Dict[str, Callable[[], Awaitable[bool]]],
+        interval: Optional[float] = None,
+        timeout: Optional[float] = None
+    ):
+        self.probes = probes
+        self.interval = interval or float(os.getenv("HEALTH_CHECK_INTERVAL", "30.0"))
+        self.timeout = timeout or float(os.getenv("HEALTH_CHECK_TIMEOUT", "5.0"))
+
+        self._status: Dict[str, Dict] = {
+            name: {"healthy": False, "latency_ms": None, "checked_at": None, "error": "not probed yet"}
+            for name in probes
+        }
+        self._round: Optional[asyncio.Task] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def _probe(self, name: str):
+        started = time.perf_counter()
+        try:
+            healthy = bool(await asyncio.wait_for(self.probes[name](), timeout=self.timeout))
+            error = None
+        except asyncio.TimeoutError:
+            healthy, error = False, f"timeout after {self.timeout:.1f}s"
+        except Exception as e:
+            healthy, error = False, str(e) or type(e).__name__
+        self._status[name] = {
+            "healthy": healthy,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "checked_at": datetime.now().isoformat(),
+            "error": error
+        }
+
+    async def refresh(self) -> Dict[str, Dict]:
+        """Probe every service concurrently and return the new statuses"""
+        if self._round is None or self._round.done():
+            self._round = asyncio.ensure_future(asyncio.gather(*(self._probe(name) for name in self.probes)))
+        await asyncio.shield(self._round)
+        return self.snapshot()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {name: dict(status) for name, status in self._status.items()}
+
+    async def start(self):
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("⚠️ Health probe round failed: %s", e)
+            await asyncio.sleep(self.interval)
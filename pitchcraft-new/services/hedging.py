@@ -0,0 +1,137 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from services.http_client import env_value, request_abandoned
+from services.tracing import TRACER
+
+
+class Hedger:
+    """Hedged requests: if the first attempt is slower than the rolling
+    `percentile` latency, send one identical second attempt and use whichever
+    succeeds first; the other is cancelled.
+
+    Hedging starts once `min_samples` latencies are recorded, and at most
+    `max_hedge_rate` of the last `window` calls may be hedged, which bounds the
+    extra upstream cost.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        percentile: float = 0.9,
+        max_hedge_rate: float = 0.1,
+        window: int = 100,
+        min_samples: int = 20,
+        min_delay: float = 0.05
+    ):
+        self.name = name
+        self.percentile = percentile
+        self.max_hedge_rate = max_hedge_rate
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+
+        self._latencies = deque(maxlen=window)
+        self._hedged = deque(maxlen=window)  # whether each recent call was hedged
+        self._stats = {"calls": 0, "hedges_fired": 0, "hedge_wins": 0, "hedges_skipped": 0}
+
+    def hedge_delay(self) -> Optional[float]:
+        """Current hedging threshold in seconds, or None while there is too little data"""
+        if len(self._latencies) < self.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile))
+        return max(self.min_delay, ordered[index])
+
+    def _may_hedge(self) -> bool:
+        if not self._hedged:
+            return True
+        return sum(self._hedged) / len(self._hedged) < self.max_hedge_rate
+
+    async def run(self, call: Callable[[], Awaitable[Any]], is_success: Callable[[Any], bool] = lambda result: True) -> Any:
+        self._stats["calls"] += 1
+        started = time.perf_counter()
+        primary_state = {"abandoned": False}
+        primary = asyncio.ensure_future(self._attempt(call, primary_state))
+
+        delay = self.hedge_delay()
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait({primary}, timeout=delay)
+                if not done:
+                    if self._may_hedge():
+                        return await self._race(call, primary, primary_state, started, is_success)
+                    self._stats["hedges_skipped"] += 1
+
+            self._hedged.append(False)
+            result = await primary
+        finally:
+            # Only reached with the primary still running if the caller was cancelled
+            primary.cancel()
+
+        if is_success(result):
+            self._latencies.append(time.perf_counter() - started)
+        return result
+
+    async def _race(self, call, primary: asyncio.Future, primary_state: Dict, started: float, is_success) -> Any:
+        self._hedged.append(True)
+        self._stats["hedges_fired"] += 1
+        TRACER.current_span().set_attribute("hedged", True)
+        hedge_state = {"abandoned": False}
+        hedge = asyncio.ensure_future(self._attempt(call, hedge_state))
+        attempts = {primary: primary_state, hedge: hedge_state}
+
+        pending = set(attempts)
+        first_result = None
+        first_error = None
+        won = False
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None and is_success(task.result()):
+                        won = True
+                        if task is hedge:
+                            self._stats["hedge_wins"] += 1
+                        self._latencies.append(time.perf_counter() - started)
+                        return task.result()
+                    if first_result is None and first_error is None:
+                        first_result, first_error = (task.result(), None) if error is None else (None, error)
+            # Neither attempt succeeded: surface the first outcome
+            if first_error is not None:
+                raise first_error
+            return first_result
+        finally:
+            for task in pending:
+                # A loser cancelled on purpose is not an upstream failure; a caller timeout is
+                attempts[task]["abandoned"] = won
+                task.cancel()
+
+    async def _attempt(self, call: Callable[[], Awaitable[Any]], state: Dict) -> Any:
+        # Runs in its own task context, so this only marks this attempt's request
+        request_abandoned.set(state)
+        return await call()
+
+    def stats(self) -> Dict:
+        fired = self._stats["hedges_fired"]
+        delay = self.hedge_delay()
+        return {
+            **self._stats,
+            "hedge_rate": round(fired / self._stats["calls"], 4) if self._stats["calls"] else 0.0,
+            "hedge_win_rate": round(self._stats["hedge_wins"] / fired, 4) if fired else 0.0,
+            "hedge_delay_ms": round(delay * 1000, 1) if delay is not None else None
+        }
+
+
+def build_hedger(service_name: str, operation: str) -> Hedger:
+    """Create a hedger for one upstream operation, configured from the environment"""
+    return Hedger(
+        f"{service_name}.{operation}",
+        percentile=float(env_value(service_name, "HEDGE_PERCENTILE", "0.9")),
+        max_hedge_rate=float(env_value(service_name, "HEDGE_MAX_RATE", "0.1")),
+        window=int(env_value(service_name, "HEDGE_WINDOW", "100")),
+        min_samples=int(env_value(service_name, "HEDGE_MIN_SAMPLES", "20")),
+        min_delay=float(env_value(service_name, "HEDGE_MIN_DELAY", "0.05"))
+    )
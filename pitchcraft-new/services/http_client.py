@@ -0,0 +1,223 @@
+import asyncio
+import contextvars
+import httpx
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+from services.adaptive_timeout import AdaptiveTimeout
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from services.metrics import UPSTREAM_DURATION, UPSTREAM_REQUESTS
+from services.rate_limiter import RateLimiter, RateLimitExceeded
+from services.tracing import TRACER
+
+logger = logging.getLogger(__name__)
+
+# Upstream services that get their own connection pool
+UPSTREAM_SERVICES = ["tambo_ai", "firecrawl", "lingo_dev", "google_tts", "resend"]
+
+# Set per task by callers that may cancel a request on purpose (the losing copy of
+# a hedged request); such cancellations are not held against the circuit breaker
+request_abandoned: contextvars.ContextVar[Optional[Dict]] = contextvars.ContextVar("request_abandoned", default=None)
+
+
+def env_value(service_name: str, key: str, default: str) -> str:
+    """Read a setting, allowing a per-service override (e.g. LINGO_DEV_HTTP_MAX_CONNECTIONS)"""
+    return os.getenv(f"{service_name.upper()}_{key}", os.getenv(key, default))
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (pip install httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def build_http_client(service_name: str) -> httpx.AsyncClient:
+    """Create a connection-pooled httpx client configured from the environment"""
+    limits = httpx.Limits(
+        max_connections=int(env_value(service_name, "HTTP_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(env_value(service_name, "HTTP_MAX_KEEPALIVE", "10")),
+        keepalive_expiry=float(env_value(service_name, "HTTP_KEEPALIVE_EXPIRY", "30.0"))
+    )
+    timeout = httpx.Timeout(
+        float(env_value(service_name, "HTTP_TIMEOUT", "30.0")),
+        connect=float(env_value(service_name, "HTTP_CONNECT_TIMEOUT", "5.0"))
+    )
+
+    http2 = env_value(service_name, "HTTP2_ENABLED", "false").lower() in ("1", "true", "yes")
+    if http2 and not _http2_available():
+        logger.warning("⚠️ HTTP/2 requested for %s but h2 is not installed, using HTTP/1.1", service_name)
+        http2 = False
+
+    return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+
+
+def build_circuit_breaker(service_name: str) -> CircuitBreaker:
+    """Create a circuit breaker configured from the environment"""
+    return CircuitBreaker(
+        service_name,
+        window=int(env_value(service_name, "CIRCUIT_WINDOW", "20")),
+        min_calls=int(env_value(service_name, "CIRCUIT_MIN_CALLS", "5")),
+        failure_rate=float(env_value(service_name, "CIRCUIT_FAILURE_RATE", "0.5")),
+        slow_call_seconds=float(env_value(service_name, "CIRCUIT_SLOW_CALL_SECONDS", "10.0")),
+        slow_call_rate=float(env_value(service_name, "CIRCUIT_SLOW_CALL_RATE", "0.8")),
+        open_seconds=float(env_value(service_name, "CIRCUIT_OPEN_SECONDS", "30.0")),
+        half_open_probes=int(env_value(service_name, "CIRCUIT_HALF_OPEN_PROBES", "1"))
+    )
+
+
+def build_adaptive_timeout(service_name: str) -> AdaptiveTimeout:
+    """Create latency-driven request timeouts configured from the environment"""
+    return AdaptiveTimeout(
+        service_name,
+        percentile=float(env_value(service_name, "ADAPTIVE_TIMEOUT_PERCENTILE", "0.99")),
+        headroom=float(env_value(service_name, "ADAPTIVE_TIMEOUT_HEADROOM", "1.5")),
+        floor=float(env_value(service_name, "ADAPTIVE_TIMEOUT_FLOOR", "1.0")),
+        ceiling=float(env_value(service_name, "ADAPTIVE_TIMEOUT_CEILING", "30.0")),
+        min_samples=int(env_value(service_name, "ADAPTIVE_TIMEOUT_MIN_SAMPLES", "20")),
+        window=int(env_value(service_name, "ADAPTIVE_TIMEOUT_WINDOW", "500"))
+    )
+
+
+def build_rate_limiter(service_name: str) -> RateLimiter:
+    """Create the request pacing limiter configured from the environment"""
+    return RateLimiter(
+        service_name,
+        rate=float(env_value(service_name, "RATE_LIMIT_RPS", "20.0")),
+        burst=float(env_value(service_name, "RATE_LIMIT_BURST", "20.0")),
+        max_concurrency=int(env_value(service_name, "RATE_LIMIT_CONCURRENCY", "16")),
+        max_wait=float(env_value(service_name, "RATE_LIMIT_MAX_WAIT", "2.0"))
+    )
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers.get("retry-after", ""))
+    except ValueError:
+        return None
+
+
+class UpstreamClient:
+    """Shared HTTP client for one upstream service.
+
+    The underlying pool is opened once (normally from the FastAPI lifespan hook)
+    and reused by every call, so requests ride on kept-alive connections instead
+    of paying a new TCP+TLS handshake each time. Every call also passes through
+    the service's circuit breaker, so a dead upstream fails in microseconds and
+    callers drop straight to their fallbacks. A rate limiter then paces calls,
+    queueing briefly when the service's request rate or concurrency is
+    exhausted and backing off when it answers 429. Unless a caller passes `timeout`,
+    each request's timeout comes from the latency observed for the same
+    operation: the `operation` name the caller passes, or method + path. Requests
+    that time out are recorded at the time they were given, so the timeout grows
+    again when an upstream slows down instead of cutting every call off.
+    """
+
+    def __init__(
+        self,
+        service_name: str,
+        client: Optional[httpx.AsyncClient] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        timeouts: Optional[AdaptiveTimeout] = None,
+        limiter: Optional[RateLimiter] = None
+    ):
+        self.service_name = service_name
+        self._client = client
+        self.breaker = breaker or build_circuit_breaker(service_name)
+        self.timeouts = timeouts or build_adaptive_timeout(service_name)
+        self.limiter = limiter or build_rate_limiter(service_name)
+        self._connect_timeout = float(env_value(service_name, "HTTP_CONNECT_TIMEOUT", "5.0"))
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Opened lazily so services still work outside the app lifespan (scripts, tests)
+        if self._client is None or self._client.is_closed:
+            self._client = build_http_client(self.service_name)
+        return self._client
+
+    async def request(self, method: str, url: str, operation: Optional[str] = None, **kwargs) -> httpx.Response:
+        operation = operation or f"{method} {httpx.URL(url).path}"
+        with TRACER.span(f"{self.service_name} {operation}", kind="client", service=self.service_name) as span:
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                UPSTREAM_REQUESTS.inc(service=self.service_name, status="circuit_open")
+                raise
+            try:
+                await self.limiter.acquire()
+            except BaseException as e:
+                self.breaker.release()
+                if isinstance(e, RateLimitExceeded):
+                    UPSTREAM_REQUESTS.inc(service=self.service_name, status="rate_limited")
+                raise
+            try:
+                response = await self._send(method, url, operation, **kwargs)
+            finally:
+                self.limiter.release()
+            span.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 400:
+                span.set_error(f"HTTP {response.status_code}")
+            return response
+
+    async def _send(self, method: str, url: str, operation: str, **kwargs) -> httpx.Response:
+        if "timeout" not in kwargs:
+            timeout = self.timeouts.timeout_for(operation)
+            kwargs["timeout"] = httpx.Timeout(timeout, connect=min(timeout, self._connect_timeout))
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except asyncio.CancelledError:
+            UPSTREAM_REQUESTS.inc(service=self.service_name, status="cancelled")
+            abandoned = request_abandoned.get()
+            if abandoned is not None and abandoned["abandoned"]:
+                self.breaker.release()
+            else:
+                # The caller's timeout gave up on the upstream
+                self.breaker.record(False, time.perf_counter() - started)
+            raise
+        except Exception as e:
+            duration = time.perf_counter() - started
+            UPSTREAM_REQUESTS.inc(service=self.service_name, status="error")
+            self.breaker.record(False, duration)
+            if isinstance(e, httpx.TimeoutException):
+                # Censored sample: the call took at least this long
+                self.timeouts.record(operation, duration)
+            raise
+        duration = time.perf_counter() - started
+        UPSTREAM_REQUESTS.inc(service=self.service_name, status=str(response.status_code))
+        UPSTREAM_DURATION.observe(duration, service=self.service_name, operation=operation)
+        if response.status_code == 429:
+            # The service is up but wants us to slow down: pace callers rather than trip the breaker
+            self.limiter.throttle(_retry_after(response))
+        self.breaker.record(response.status_code < 500, duration)
+        self.timeouts.record(operation, duration)
+        return response
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+def create_upstream_clients() -> Dict[str, UpstreamClient]:
+    """Open one pooled client per upstream service"""
+    return {name: UpstreamClient(name, build_http_client(name)) for name in UPSTREAM_SERVICES}
+
+
+async def close_upstream_clients(clients: Dict[str, UpstreamClient]):
+    """Close every pooled client, draining kept-alive connections"""
+    for client in clients.values():
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning("⚠️ Error closing %s HTTP client: %s", client.service_name, e)
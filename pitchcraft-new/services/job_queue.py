@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its depth limit"""
+
+
+class JobQueue:
+    """In-process job queue drained by a fixed pool of workers.
+
+    `submit` returns a job record immediately; a worker later calls
+    `run(job)`, which may update `job["stages"]` as it makes progress and
+    returns the job's result. Finished jobs are kept for polling until the
+    retention limit pushes the oldest ones out.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_depth: Optional[int] = None, retention: Optional[int] = None):
+        self.workers = workers or int(os.getenv("JOB_WORKERS", "4"))
+        self.max_depth = max_depth or int(os.getenv("JOB_QUEUE_MAX_DEPTH", "100"))
+        self.retention = retention or int(os.getenv("JOB_RETENTION", "1000"))
+
+        self._jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._runners: Dict[str, Callable[[Dict], Awaitable[Any]]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._cancel_requested = set()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._stats = {"submitted": 0, "rejected": 0, "completed": 0, "failed": 0, "cancelled": 0}
+
+    def _depth(self) -> int:
+        return sum(1 for job in self._jobs.values() if job["status"] == "queued")
+
+    def submit(self, run: Callable[[Dict], Awaitable[Any]], stages: Optional[List[str]] = None) -> Dict:
+        if self._queue is None:
+            raise RuntimeError("Job queue is not running")
+        if self._depth() >= self.max_depth:
+            self._stats["rejected"] += 1
+            raise QueueFullError(f"Job queue is full ({self.max_depth} jobs waiting)")
+
+        job = {
+            "id": f"job_{uuid.uuid4().hex}",
+            "status": "queued",
+            "stages": {name: {"status": "pending"} for name in stages or []},
+            "result": None,
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None
+        }
+        self._jobs[job["id"]] = job
+        self._runners[job["id"]] = run
+        self._queue.put_nowait(job["id"])
+        self._stats["submitted"] += 1
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; returns False if it already finished"""
+        job = self._jobs.get(job_id)
+        if job is None or job["status"] not in ("queued", "running"):
+            return False
+        task = self._tasks.get(job_id)
+        if task is not None:
+            self._cancel_requested.add(job_id)
+            task.cancel()
+        else:
+            # Still queued: the worker skips it when it comes up
+            self._finish(job, "cancelled")
+        return True
+
+    def _finish(self, job: Dict, status: str, result: Any = None, error: Optional[str] = None):
+        job.update({"status": status, "result": result, "error": error, "finished_at": time.time()})
+        self._runners.pop(job["id"], None)
+        self._stats[status] += 1
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond the retention limit"""
+        overflow = len(self._jobs) - self.retention
+        if overflow <= 0:
+            return
+        for job_id in list(self._jobs):
+            if overflow <= 0:
+                break
+            if self._jobs[job_id]["finished_at"] is not None:
+                del self._jobs[job_id]
+                overflow -= 1
+
+    async def start(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._worker_tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in list(self._tasks.values()) + self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._queue = None
+
+    async def _work(self):
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] != "queued":
+                continue
+
+            job["status"] = "running"
+            job["started_at"] = time.time()
+            task = asyncio.create_task(self._runners[job_id](job))
+            self._tasks[job_id] = task
+            try:
+                result = await task
+                self._finish(job, "completed", result=result)
+            except asyncio.CancelledError:
+                self._finish(job, "cancelled")
+                if job_id not in self._cancel_requested:
+                    # The worker itself is being stopped
+                    raise
+            except Exception as e:
+                logger.exception("⚠️ Job %s failed: %s", job_id, e)
+                self._finish(job, "failed", error=str(e))
+            finally:
+                self._tasks.pop(job_id, None)
+                self._cancel_requested.discard(job_id)
+
+    def stats(self) -> Dict:
+        return {
+            **self._stats,
+            "queued": self._depth(),
+            "running": len(self._tasks),
+            "workers": self.workers,
+            "max_depth": self.max_depth
+        }
@@ -1,60 +1,73 @@
-import httpx
+import logging
 import os
 import json
 from typing import Dict, List, Optional
 from datetime import datetime
 
+from services.http_client import UpstreamClient
+from services.concurrency import as_completed_bounded
+from services.metrics import record_fallback
+from services.tracing import TRACER
+from services.translation_memory import TranslationMemory
+
+logger = logging.getLogger(__name__)
+
+# Pitch content is always generated in English
+SOURCE_LANGUAGE = "en"
+
 class LingoService:
-    def __init__(self):
+    def __init__(self, http_client: Optional[UpstreamClient] = None, translation_memory: Optional[TranslationMemory] = None):
         self.api_key = os.getenv("LINGO_DEV_API_KEY")
         self.base_url = os.getenv("LINGO_DEV_URL", "https://api.lingo.dev")
+        self.http_client = http_client or UpstreamClient("lingo_dev")
+        # Deck translation batching limits
+        self.batch_max_items = int(os.getenv("LINGO_BATCH_MAX_ITEMS", "50"))
+        self.batch_max_chars = int(os.getenv("LINGO_BATCH_MAX_CHARS", "8000"))
+        self.batch_concurrency = int(os.getenv("LINGO_BATCH_CONCURRENCY", "4"))
+        self.translation_memory = translation_memory or TranslationMemory()
         
     async def check_health(self) -> bool:
         """Check if Lingo service is available"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/v1/status",
-                    headers={"Authorization": f"Bearer {self.api_key}"},
-                    timeout=10.0
-                )
-                return response.status_code == 200
+            response = await self.http_client.get(
+                f"{self.base_url}/v1/status",
+                headers={"Authorization": f"Bearer {self.api_key}"}
+            )
+            return response.status_code == 200
         except:
             return False
     
     async def test_connection(self) -> Dict:
         """Test Lingo API connection"""
         try:
-            async with httpx.AsyncClient() as client:
-                # Test with a simple translation
-                response = await client.post(
-                    f"{self.base_url}/v1/translate",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "text": "Hello, this is a test",
-                        "source_language": "en",
-                        "target_language": "es"
-                    },
-                    timeout=15.0
-                )
+            # Test with a simple translation
+            response = await self.http_client.post(
+                f"{self.base_url}/v1/translate",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "text": "Hello, this is a test",
+                    "source_language": "en",
+                    "target_language": "es"
+                }
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                return {
+                    "status": "connected",
+                    "message": "Lingo API is working",
+                    "sample_translation": result.get("translated_text", "Translation successful")
+                }
+            else:
+                return {
+                    "status": "error",
+                    "code": response.status_code,
+                    "message": response.text
+                }
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    return {
-                        "status": "connected",
-                        "message": "Lingo API is working",
-                        "sample_translation": result.get("translated_text", "Translation successful")
-                    }
-                else:
-                    return {
-                        "status": "error",
-                        "code": response.status_code,
-                        "message": response.text
-                    }
-                    
         except Exception as e:
             return {
                 "status": "error",
@@ -63,18 +76,22 @@ class LingoService:
     
     async def translate_pitch(self, pitch_content: Dict, target_language: str) -> Dict:
         """Translate pitch deck content to target language"""
+        with TRACER.span("lingo.translate_pitch", language=target_language):
+            return await self._translate_pitch(pitch_content, target_language)
+    
+    async def _translate_pitch(self, pitch_content: Dict, target_language: str) -> Dict:
         try:
             translated_content = pitch_content.copy()
             
-            # If slides are present, translate each slide
+            # If slides are present, translate every distinct string in a few batched calls
             if "slides" in pitch_content and isinstance(pitch_content["slides"], list):
-                translated_slides = []
+                texts = self._collect_slide_texts(pitch_content["slides"])
+                translations = await self._translate_texts(texts, target_language)
                 
-                for slide in pitch_content["slides"]:
-                    translated_slide = await self._translate_slide(slide, target_language)
-                    translated_slides.append(translated_slide)
-                
-                translated_content["slides"] = translated_slides
+                translated_content["slides"] = [
+                    self._apply_translations(slide, translations)
+                    for slide in pitch_content["slides"]
+                ]
             
             # Add translation metadata
             translated_content["translation"] = {
@@ -86,97 +103,162 @@ class LingoService:
             return translated_content
             
         except Exception as e:
-            print(f"Error translating pitch: {str(e)}")
+            logger.warning("Error translating pitch: %s", e)
+            record_fallback("lingo_dev", "translate_pitch")
             return self._generate_fallback_translation(pitch_content, target_language)
     
-    async def _translate_slide(self, slide: Dict, target_language: str) -> Dict:
-        """Translate individual slide content"""
+    def _collect_slide_texts(self, slides: List[Dict]) -> List[str]:
+        """Collect the distinct translatable strings of a deck, in first-seen order"""
+        texts = {}
+        for slide in slides:
+            if not isinstance(slide, dict):
+                continue
+            candidates = [slide.get("title"), slide.get("content")]
+            if isinstance(slide.get("details"), list):
+                candidates.extend(slide["details"])
+            for text in candidates:
+                if isinstance(text, str) and text.strip():
+                    texts[text] = None
+        return list(texts)
+    
+    def _apply_translations(self, slide: Dict, translations: Dict[str, str]) -> Dict:
+        """Map translated strings back into a slide, keeping originals for anything untranslated"""
+        if not isinstance(slide, dict):
+            return slide
+        
+        translated_slide = slide.copy()
+        for field in ("title", "content"):
+            if isinstance(slide.get(field), str):
+                translated_slide[field] = translations.get(slide[field], slide[field])
+        
+        if isinstance(slide.get("details"), list):
+            translated_slide["details"] = [
+                translations.get(detail, detail) if isinstance(detail, str) else detail
+                for detail in slide["details"]
+            ]
+        
+        return translated_slide
+    
+    def _build_batches(self, texts: List[str]) -> List[List[str]]:
+        """Split texts into batches bounded by item count and total characters"""
+        batches = []
+        current = []
+        current_chars = 0
+        
+        for text in texts:
+            if current and (len(current) >= self.batch_max_items or current_chars + len(text) > self.batch_max_chars):
+                batches.append(current)
+                current = []
+                current_chars = 0
+            current.append(text)
+            current_chars += len(text)
+        
+        if current:
+            batches.append(current)
+        return batches
+    
+    async def _translate_texts(self, texts: List[str], target_language: str) -> Dict[str, str]:
+        """Translate distinct texts, returning a source -> translation map.
+        
+        Translation memory is consulted first; only misses go to the batch endpoint.
+        """
+        translations = await self._lookup_memory(texts, target_language)
+        misses = [text for text in texts if text not in translations]
+        batches = self._build_batches(misses)
+        fresh = {}
+        
+        calls = [lambda batch=batch: self._request_batch(batch, target_language) for batch in batches]
+        async for index, translated, error in as_completed_bounded(calls, self.batch_concurrency):
+            if error is not None or translated is None:
+                if error is not None:
+                    logger.warning("Error in batch translation: %s", error)
+                # Texts in a failed batch keep their original wording
+                record_fallback("lingo_dev", "translate_batch")
+                continue
+            fresh.update(zip(batches[index], translated))
+        
+        await self._store_memory(fresh, target_language)
+        translations.update(fresh)
+        return translations
+    
+    async def _lookup_memory(self, texts: List[str], target_language: str) -> Dict[str, str]:
         try:
-            translated_slide = slide.copy()
-            
-            # Translate title
-            if "title" in slide:
-                translated_title = await self._translate_text(slide["title"], target_language)
-                translated_slide["title"] = translated_title
-            
-            # Translate content
-            if "content" in slide:
-                translated_content = await self._translate_text(slide["content"], target_language)
-                translated_slide["content"] = translated_content
-            
-            # Translate details if present
-            if "details" in slide and isinstance(slide["details"], list):
-                translated_details = []
-                for detail in slide["details"]:
-                    translated_detail = await self._translate_text(detail, target_language)
-                    translated_details.append(translated_detail)
-                translated_slide["details"] = translated_details
-            
-            return translated_slide
-            
+            return await self.translation_memory.lookup_async(texts, SOURCE_LANGUAGE, target_language)
         except Exception as e:
-            print(f"Error translating slide: {str(e)}")
-            return slide  # Return original if translation fails
+            logger.warning("Translation memory lookup failed: %s", e)
+            return {}
+    
+    async def _store_memory(self, translations: Dict[str, str], target_language: str):
+        if not translations:
+            return
+        try:
+            await self.translation_memory.store_async(translations, SOURCE_LANGUAGE, target_language)
+        except Exception as e:
+            logger.warning("Translation memory store failed: %s", e)
     
     async def _translate_text(self, text: str, target_language: str) -> str:
         """Translate individual text using Lingo API"""
+        cached = await self._lookup_memory([text], target_language)
+        if text in cached:
+            return cached[text]
+        
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/v1/translate",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "text": text,
-                        "source_language": "en",
-                        "target_language": target_language,
-                        "preserve_formatting": True
-                    },
-                    timeout=20.0
-                )
+            response = await self.http_client.post(
+                f"{self.base_url}/v1/translate",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "text": text,
+                    "source_language": SOURCE_LANGUAGE,
+                    "target_language": target_language,
+                    "preserve_formatting": True
+                }
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                translated = result.get("translated_text")
+                if translated is None:
+                    return text
+                await self._store_memory({text: translated}, target_language)
+                return translated
+            else:
+                return text  # Return original if API fails
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    return result.get("translated_text", text)
-                else:
-                    return text  # Return original if API fails
-                    
         except Exception as e:
-            print(f"Error translating text: {str(e)}")
+            logger.warning("Error translating text: %s", e)
             return text  # Return original if translation fails
     
     async def detect_language(self, text: str) -> Dict:
         """Detect the language of given text"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/v1/detect",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "text": text
-                    },
-                    timeout=15.0
-                )
+            response = await self.http_client.post(
+                f"{self.base_url}/v1/detect",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "text": text
+                }
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                return {
+                    "detected_language": result.get("language", "en"),
+                    "confidence": result.get("confidence", 0.95),
+                    "status": "success"
+                }
+            else:
+                return {
+                    "detected_language": "en",
+                    "confidence": 0.5,
+                    "status": "fallback"
+                }
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    return {
-                        "detected_language": result.get("language", "en"),
-                        "confidence": result.get("confidence", 0.95),
-                        "status": "success"
-                    }
-                else:
-                    return {
-                        "detected_language": "en",
-                        "confidence": 0.5,
-                        "status": "fallback"
-                    }
-                    
         except Exception as e:
             return {
                 "detected_language": "en",
@@ -188,29 +270,27 @@ class LingoService:
     async def get_supported_languages(self) -> Dict:
         """Get list of supported languages"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/v1/languages",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}"
-                    },
-                    timeout=10.0
-                )
+            response = await self.http_client.get(
+                f"{self.base_url}/v1/languages",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}"
+                }
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                return {
+                    "languages": result.get("languages", self._get_fallback_languages()),
+                    "total": len(result.get("languages", [])),
+                    "status": "success"
+                }
+            else:
+                return {
+                    "languages": self._get_fallback_languages(),
+                    "total": len(self._get_fallback_languages()),
+                    "status": "fallback"
+                }
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    return {
-                        "languages": result.get("languages", self._get_fallback_languages()),
-                        "total": len(result.get("languages", [])),
-                        "status": "success"
-                    }
-                else:
-                    return {
-                        "languages": self._get_fallback_languages(),
-                        "total": len(self._get_fallback_languages()),
-                        "status": "fallback"
-                    }
-                    
         except Exception as e:
             return {
                 "languages": self._get_fallback_languages(),
@@ -240,7 +320,14 @@ class LingoService:
         
         # Add fallback translation notice
         if "slides" in fallback_content and isinstance(fallback_content["slides"], list):
+            # Copy the slides too: the caller's content is shared with the other languages
+            fallback_content["slides"] = [
+                dict(slide) if isinstance(slide, dict) else slide
+                for slide in fallback_content["slides"]
+            ]
             for slide in fallback_content["slides"]:
+                if not isinstance(slide, dict):
+                    continue
                 if "title" in slide:
                     slide["title"] = f"[{target_language.upper()}] {slide['title']}"
                 if "content" in slide:
@@ -258,27 +345,35 @@ class LingoService:
     async def translate_text_batch(self, texts: List[str], target_language: str) -> List[str]:
         """Translate multiple texts in batch"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/v1/translate/batch",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "texts": texts,
-                        "source_language": "en",
-                        "target_language": target_language
-                    },
-                    timeout=30.0
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return result.get("translated_texts", texts)
-                else:
-                    return texts  # Return originals if API fails
-                    
+            translations = await self._translate_texts(list(dict.fromkeys(texts)), target_language)
+            return [translations.get(text, text) for text in texts]  # Originals for anything untranslated
+            
         except Exception as e:
-            print(f"Error in batch translation: {str(e)}")
-            return texts  # Return originals if translation fails
\ No newline at end of file
+            logger.warning("Error in batch translation: %s", e)
+            return texts  # Return originals if translation fails
+    
+    async def _request_batch(self, texts: List[str], target_language: str) -> Optional[List[str]]:
+        """Call the batch endpoint; returns None unless every text came back translated"""
+        with TRACER.span("lingo.translate_batch", language=target_language, texts=len(texts)) as span:
+            response = await self.http_client.post(
+                f"{self.base_url}/v1/translate/batch",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "texts": texts,
+                    "source_language": SOURCE_LANGUAGE,
+                    "target_language": target_language,
+                    "preserve_formatting": True
+                }
+            )
+            
+            if response.status_code != 200:
+                return None
+            
+            translated = response.json().get("translated_texts")
+            if not isinstance(translated, list) or len(translated) != len(texts):
+                span.set_error("incomplete batch response")
+                return None
+            return translated
@@ -0,0 +1,207 @@
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from services.tracing import TRACER
+
+# Correlation ID of the HTTP request being handled; tasks started for it inherit it
+request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+TEXT_FORMAT = "%(asctime)s %(levelname)-7s [%(request_id)s] %(name)s: %(message)s"
+
+
+class ContextFilter(logging.Filter):
+    """Stamps records with the request and trace they were logged under"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get() or "-"
+        record.trace_id = TRACER.current_span().trace_id
+        return True
+
+
+class RepeatFilter(logging.Filter):
+    """Lets an identical warning through once per `window` seconds.
+
+    Fallback warnings tend to repeat for every request while an upstream is
+    down; the copies in between are counted and reported on the next one let
+    through. Records below WARNING are never suppressed.
+    """
+
+    def __init__(self, window: float = 60.0, max_keys: int = 1000):
+        super().__init__()
+        self.window = window
+        self.max_keys = max_keys
+        self._seen: "OrderedDict[tuple, list]" = OrderedDict()  # key -> [first logged at, suppressed]
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.window <= 0 or record.levelno < logging.WARNING:
+            return True
+
+        key = (record.name, record.levelno, record.getMessage())
+        now = time.monotonic()
+        with self._lock:
+            seen = self._seen.get(key)
+            if seen is not None and now - seen[0] < self.window:
+                seen[1] += 1
+                self.suppressed += 1
+                return False
+
+            if seen is not None and seen[1]:
+                record.repeated = seen[1]
+            self._seen[key] = [now, 0]
+            self._seen.move_to_end(key)
+            while len(self._seen) > self.max_keys:
+                self._seen.popitem(last=False)
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the writer thread without formatting them on the caller's thread"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Same process, so the record (and any traceback) can be passed as-is
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # A stalled sink must never block the event loop; shed records instead
+            self.dropped += 1
+
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        repeated = getattr(record, "repeated", 0)
+        if repeated:
+            message += f" (repeated {repeated} more times)"
+        return message
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None)
+        }
+        if getattr(record, "trace_id", None):
+            entry["trace_id"] = record.trace_id
+        if getattr(record, "repeated", 0):
+            entry["repeated"] = record.repeated
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class LogManager:
+    """Routes all logging through a bounded queue to a background writer thread.
+
+    Callers only stamp the record and enqueue it; formatting and the write to
+    stdout happen on the listener thread, so a slow sink never stalls the event
+    loop. Records logged before `start()` wait in the queue.
+    """
+
+    def __init__(self, level: str = "INFO", fmt: str = "text", queue_size: int = 10000, repeat_window: float = 60.0):
+        self.level = level.upper()
+        self.format = fmt.lower()
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.queue_handler = _QueueHandler(self.queue)
+        self.queue_handler.addFilter(ContextFilter())
+        self.repeat_filter = RepeatFilter(repeat_window)
+        self.queue_handler.addFilter(self.repeat_filter)
+
+        writer = logging.StreamHandler(sys.stdout)
+        writer.setFormatter(JsonFormatter() if self.format == "json" else _TextFormatter(TEXT_FORMAT))
+        self.listener = logging.handlers.QueueListener(self.queue, writer, respect_handler_level=False)
+        self._running = False
+
+    def install(self):
+        root = logging.getLogger()
+        if self.queue_handler not in root.handlers:
+            root.addHandler(self.queue_handler)
+        root.setLevel(self.level)
+        # httpx logs every upstream request at INFO
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    def start(self):
+        if not self._running:
+            self.listener.start()
+            self._running = True
+
+    def stop(self):
+        """Write out everything queued and stop the writer thread"""
+        if self._running:
+            self.listener.stop()
+            self._running = False
+
+    def stats(self) -> Dict:
+        return {
+            "level": self.level,
+            "format": self.format,
+            "queued": self.queue.qsize(),
+            "dropped": self.queue_handler.dropped,
+            "repeats_suppressed": self.repeat_filter.suppressed
+        }
+
+
+def build_log_manager() -> LogManager:
+    """Create the log manager configured from the environment"""
+    return LogManager(
+        level=os.getenv("LOG_LEVEL", "INFO"),
+        fmt=os.getenv("LOG_FORMAT", "text"),
+        queue_size=int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+        repeat_window=float(os.getenv("LOG_REPEAT_WINDOW", "60.0"))
+    )
+
+
+class RequestIdMiddleware:
+    """ASGI middleware giving each HTTP request a correlation ID.
+
+    An incoming X-Request-ID header is reused, otherwise one is generated; it
+    is set for everything logged while handling the request and echoed back
+    in the response headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1")[:64]
+        correlation_id = incoming or uuid.uuid4().hex[:16]
+        token = request_id.set(correlation_id)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-request-id", correlation_id.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id.reset(token)
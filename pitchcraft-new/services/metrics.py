@@ -0,0 +1,165 @@
+import logging
+import math
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from services.tracing import TRACER
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from fast cache hits up to the pipeline deadline
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_sample(name: str, labels: Dict[str, str], value: float) -> str:
+    if labels:
+        rendered = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+        return f"{name}{{{rendered}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> Iterable[Sample]:
+        for key, value in self._values.items():
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List] = {}  # key -> [bucket counts, sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][index] += 1
+                break
+        series[1] += value
+        series[2] += 1
+
+    def samples(self) -> Iterable[Sample]:
+        for key, (counts, total, count) in self._series.items():
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_bucket", {**labels, "le": "+Inf"}, count
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class Registry:
+    """Holds metrics and renders them in the Prometheus text exposition format.
+
+    Collectors are callables run at scrape time that return
+    (name, kind, help, samples) tuples, for values that already live elsewhere
+    (cache statistics, queue depths).
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Iterable[Sample]]]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, Iterable[Sample]]]]):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        families = [(metric.name, metric.kind, metric.documentation, metric.samples()) for metric in self._metrics]
+        for collector in self._collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                logger.exception("⚠️ Metrics collector failed: %s", e)
+
+        lines = []
+        for name, kind, documentation, samples in families:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(_format_sample(sample_name, labels, value) for sample_name, labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_DURATION = REGISTRY.register(Histogram(
+    "pitchcraft_stage_duration_seconds", "Time spent in each pipeline stage", ["pipeline", "stage", "status"]
+))
+STAGE_FALLBACKS = REGISTRY.register(Counter(
+    "pitchcraft_stage_fallbacks_total", "Pipeline stages that failed or timed out and used their fallback", ["pipeline", "stage"]
+))
+PIPELINES_IN_FLIGHT = REGISTRY.register(Gauge(
+    "pitchcraft_pipelines_in_flight", "Pipelines currently running", ["pipeline"]
+))
+UPSTREAM_DURATION = REGISTRY.register(Histogram(
+    "pitchcraft_upstream_request_duration_seconds", "Latency of upstream API requests that got a response", ["service", "operation"]
+))
+UPSTREAM_REQUESTS = REGISTRY.register(Counter(
+    "pitchcraft_upstream_requests_total", "Upstream API requests by outcome (HTTP status, error, circuit_open, rate_limited)", ["service", "status"]
+))
+FALLBACKS = REGISTRY.register(Counter(
+    "pitchcraft_fallbacks_total", "Fallback activations by service and operation", ["service", "operation"]
+))
+
+
+def record_fallback(service: str, operation: str):
+    """Count a fallback activation and mark it on the current trace span"""
+    FALLBACKS.inc(service=service, operation=operation)
+    TRACER.current_span().set_attribute("fallback", f"{service}.{operation}")
@@ -0,0 +1,176 @@
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from services.metrics import PIPELINES_IN_FLIGHT, STAGE_DURATION, STAGE_FALLBACKS
+from services.tracing import TRACER
+
+logger = logging.getLogger(__name__)
+
+# Event-loop time at which the running stage's timeout expires
+_stage_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("stage_deadline", default=None)
+
+
+def stage_time_left(margin: float = 0.0) -> Optional[float]:
+    """Seconds left before the current stage times out, less `margin`; None outside a stage.
+
+    Stages that gather partial results under their own deadline use this to
+    return what they have before the pipeline cancels them.
+    """
+    deadline = _stage_deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - asyncio.get_running_loop().time() - margin)
+
+
+class Stage:
+    """One step of a pipeline.
+
+    `run` receives the results of the stages completed so far and returns this
+    stage's result. If it raises or runs out of time, `fallback(results, reason)`
+    supplies the result instead. Disabled stages are skipped but still count as
+    done for their dependents.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[Dict[str, Any]], Awaitable[Any]],
+        depends_on: Sequence[str] = (),
+        weight: float = 1.0,
+        max_timeout: Optional[float] = None,
+        fallback: Optional[Callable[[Dict[str, Any], str], Any]] = None,
+        enabled: bool = True
+    ):
+        self.name = name
+        self.run = run
+        self.depends_on = list(depends_on)
+        self.weight = weight
+        self.max_timeout = max_timeout
+        self.fallback = fallback
+        self.enabled = enabled
+
+
+class Pipeline:
+    """Runs stages as a dependency graph under one end-to-end deadline.
+
+    Independent stages run concurrently. When a stage starts it gets a share of
+    the remaining time proportional to its weight on the longest chain of
+    enabled stages still ahead of it, so time saved early flows to later stages
+    instead of being lost to fixed per-stage timeouts.
+    """
+
+    def __init__(self, stages: List[Stage], deadline: float, name: str = "pipeline"):
+        self.name = name
+        self.stages = {stage.name: stage for stage in stages}
+        self.deadline = deadline
+        self._dependents = {name: [] for name in self.stages}
+        for stage in stages:
+            for dependency in stage.depends_on:
+                if dependency not in self.stages:
+                    raise ValueError(f"Stage {stage.name} depends on unknown stage {dependency}")
+                self._dependents[dependency].append(stage.name)
+
+    def _chain_weight(self, name: str) -> float:
+        """Weight of this stage plus the heaviest chain of enabled stages after it"""
+        stage = self.stages[name]
+        own = stage.weight if stage.enabled else 0.0
+        return own + max((self._chain_weight(child) for child in self._dependents[name]), default=0.0)
+
+    async def run(self, on_stage: Optional[Callable[[str, Any, Dict], None]] = None) -> Dict:
+        """Run every stage; `on_stage(name, result, timing)` is called as each one finishes"""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline_at = started + self.deadline
+
+        results: Dict[str, Any] = {}
+        timings: Dict[str, Dict] = {}
+        remaining = dict(self.stages)
+        running: Dict[asyncio.Task, str] = {}
+        finished = set()
+
+        def ready(stage: Stage) -> bool:
+            return all(dependency in finished for dependency in stage.depends_on)
+
+        def start(stage: Stage):
+            now = loop.time()
+            if not stage.enabled:
+                results[stage.name] = None
+                timings[stage.name] = {"status": "skipped", "started_ms": round((now - started) * 1000, 1), "duration_ms": 0.0}
+                finished.add(stage.name)
+                if on_stage:
+                    on_stage(stage.name, None, timings[stage.name])
+                return
+
+            budget = max(deadline_at - now, 0.0)
+            chain = self._chain_weight(stage.name)
+            timeout = budget * stage.weight / chain if chain > 0 else budget
+            if stage.max_timeout is not None:
+                timeout = min(timeout, stage.max_timeout)
+
+            timings[stage.name] = {"started_ms": round((now - started) * 1000, 1), "timeout_s": round(timeout, 3)}
+            task = asyncio.ensure_future(self._run_stage(stage, dict(results), timeout))
+            running[task] = stage.name
+
+        PIPELINES_IN_FLIGHT.inc(pipeline=self.name)
+        try:
+            while remaining or running:
+                # Start everything whose dependencies are done; skipped stages may unlock more
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for name, stage in list(remaining.items()):
+                        if ready(stage):
+                            del remaining[name]
+                            start(stage)
+                            progressed = True
+
+                if not running:
+                    if remaining:
+                        raise ValueError(f"Pipeline has a dependency cycle: {sorted(remaining)}")
+                    break
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    result, status, reason, duration = task.result()
+                    results[name] = result
+                    finished.add(name)
+                    timings[name].update({"status": status, "duration_ms": round(duration * 1000, 1)})
+                    STAGE_DURATION.observe(duration, pipeline=self.name, stage=name, status=status)
+                    if reason:
+                        timings[name]["fallback_reason"] = reason
+                        STAGE_FALLBACKS.inc(pipeline=self.name, stage=name)
+                    if on_stage:
+                        on_stage(name, result, timings[name])
+        finally:
+            PIPELINES_IN_FLIGHT.dec(pipeline=self.name)
+            for task in running:
+                task.cancel()
+
+        return {
+            "results": results,
+            "timings": timings,
+            "total_ms": round((loop.time() - started) * 1000, 1)
+        }
+
+    async def _run_stage(self, stage: Stage, results: Dict[str, Any], timeout: float):
+        with TRACER.span(stage.name, pipeline=self.name, timeout_s=round(timeout, 3)) as span:
+            # Runs in the stage's own task, so this only applies to this stage
+            _stage_deadline.set(asyncio.get_running_loop().time() + timeout)
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(stage.run(results), timeout=timeout)
+                return result, "ok", None, time.perf_counter() - started
+            except asyncio.TimeoutError:
+                reason = f"timeout after {timeout:.1f}s"
+            except Exception as e:
+                reason = str(e) or type(e).__name__
+
+            logger.warning("⚠️ Stage %s failed, using fallback: %s", stage.name, reason)
+            span.set_attribute("fallback_reason", reason)
+            span.set_error(reason)
+            result = stage.fallback(results, reason) if stage.fallback else None
+            return result, "fallback", reason, time.perf_counter() - started
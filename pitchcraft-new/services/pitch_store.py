@@ -0,0 +1,131 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class PitchStore:
+    """Storage for generated pitch decks: SQLite (WAL mode) behind an in-memory LRU.
+
+    New pitches go into the hot tier immediately, so they can be read back at
+    once, while the SQLite write runs in the background off the request path.
+    """
+
+    def __init__(self, path: Optional[str] = None, hot_size: Optional[int] = None):
+        self.path = path or os.getenv("PITCH_STORE_PATH", "data/pitches.db")
+        self.hot_size = hot_size or int(os.getenv("PITCH_STORE_HOT_SIZE", "500"))
+
+        self._hot: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pending: Set[asyncio.Task] = set()
+        self._stats = {"hot_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "write_errors": 0}
+
+    @staticmethod
+    def new_id(prefix: str = "pitch") -> str:
+        """Collision-free pitch id (the old timestamp ids collided within the same second)"""
+        return f"{prefix}_{uuid.uuid4().hex}"
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10.0)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS pitches (
+                    id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _remember(self, pitch_id: str, pitch: Dict):
+        self._hot[pitch_id] = pitch
+        self._hot.move_to_end(pitch_id)
+        while len(self._hot) > self.hot_size:
+            self._hot.popitem(last=False)
+
+    def _write(self, pitch_id: str, data: str):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO pitches (id, data, created_at) VALUES (?, ?, ?)",
+                (pitch_id, data, time.time())
+            )
+            conn.commit()
+
+    def _read(self, pitch_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._connect().execute("SELECT data FROM pitches WHERE id = ?", (pitch_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    async def save(self, pitch: Dict):
+        """Store a pitch and wait until it is on disk"""
+        pitch_id = pitch["id"]
+        self._remember(pitch_id, pitch)
+        # Serialize now so later mutations of the dict cannot leak into the stored copy
+        data = json.dumps(pitch, default=str)
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._write, pitch_id, data)
+            self._stats["writes"] += 1
+        except Exception as e:
+            self._stats["write_errors"] += 1
+            logger.error("⚠️ Failed to persist pitch %s: %s", pitch_id, e)
+
+    def save_background(self, pitch: Dict):
+        """Store a pitch without waiting for the disk write"""
+        task = asyncio.get_running_loop().create_task(self.save(pitch))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def get(self, pitch_id: str) -> Optional[Dict]:
+        pitch = self._hot.get(pitch_id)
+        if pitch is not None:
+            self._hot.move_to_end(pitch_id)
+            self._stats["hot_hits"] += 1
+            return pitch
+
+        loop = asyncio.get_running_loop()
+        pitch = await loop.run_in_executor(None, self._read, pitch_id)
+        if pitch is None:
+            self._stats["misses"] += 1
+            return None
+
+        self._stats["disk_hits"] += 1
+        self._remember(pitch_id, pitch)
+        return pitch
+
+    async def flush(self):
+        """Wait for background writes still in flight"""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def stats(self) -> Dict:
+        hits = self._stats["hot_hits"] + self._stats["disk_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "hot_entries": len(self._hot),
+            "pending_writes": len(self._pending)
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,128 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a caller could not get a request slot before its queueing deadline"""
+
+
+class RateLimiter:
+    """Token bucket plus concurrency cap for one upstream service.
+
+    Callers wait (in arrival order) for a concurrency slot and a token, but no
+    longer than `max_wait` seconds; past that they get RateLimitExceeded and
+    fall back instead of piling onto the API. A 429 from the upstream pauses
+    token issuance for the Retry-After period. A `rate` or `max_concurrency`
+    of 0 disables that limit.
+    """
+
+    def __init__(self, name: str, rate: float = 20.0, burst: float = 20.0, max_concurrency: int = 16, max_wait: float = 2.0):
+        self.name = name
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+
+        self._tokens = self.burst
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._in_flight = 0
+        # Created on first use so they bind to the running event loop
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._order: Optional[asyncio.Lock] = None
+        self._stats = {"acquired": 0, "rejected": 0, "throttled": 0, "waited": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+
+    def _refill(self, now: float):
+        if self.rate > 0:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _reject(self, reason: str):
+        self._stats["rejected"] += 1
+        raise RateLimitExceeded(f"{self.name} rate limit: {reason}")
+
+    async def acquire(self):
+        """Wait for a concurrency slot and a token, or raise RateLimitExceeded"""
+        started = time.monotonic()
+        deadline = started + self.max_wait
+
+        if self.max_concurrency > 0:
+            if self._slots is None:
+                self._slots = asyncio.Semaphore(self.max_concurrency)
+            if not self._slots.locked():
+                # A free slot is taken without waiting, even when max_wait is 0
+                await self._slots.acquire()
+            else:
+                try:
+                    await asyncio.wait_for(self._slots.acquire(), timeout=max(0.0, deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    self._reject(f"{self.max_concurrency} requests already in flight")
+
+        try:
+            if self.rate > 0 or self._paused_until:
+                await self._take_token(deadline)
+        except BaseException:
+            if self._slots is not None:
+                self._slots.release()
+            raise
+
+        self._in_flight += 1
+        waited_ms = (time.monotonic() - started) * 1000
+        self._stats["acquired"] += 1
+        if waited_ms >= 1.0:
+            self._stats["waited"] += 1
+        self._stats["wait_ms_total"] += waited_ms
+        self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], waited_ms)
+
+    async def _take_token(self, deadline: float):
+        if self._order is None:
+            self._order = asyncio.Lock()
+        if not self._order.locked():
+            await self._order.acquire()
+        else:
+            try:
+                await asyncio.wait_for(self._order.acquire(), timeout=max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                self._reject("queue wait exceeded")
+
+        try:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self._paused_until > now:
+                    wait = self._paused_until - now
+                elif self.rate <= 0 or self._tokens >= 1.0:
+                    if self.rate > 0:
+                        self._tokens -= 1.0
+                    return
+                else:
+                    wait = (1.0 - self._tokens) / self.rate
+                if now + wait > deadline:
+                    self._reject("queue wait exceeded")
+                await asyncio.sleep(wait)
+        finally:
+            self._order.release()
+
+    def release(self):
+        self._in_flight = max(0, self._in_flight - 1)
+        if self._slots is not None:
+            self._slots.release()
+
+    def throttle(self, retry_after: Optional[float]):
+        """The upstream answered 429: hold back new requests for `retry_after` seconds"""
+        self._stats["throttled"] += 1
+        pause = retry_after if retry_after is not None else 1.0
+        self._paused_until = max(self._paused_until, time.monotonic() + pause)
+        self._tokens = 0.0
+
+    def stats(self) -> Dict:
+        acquired = self._stats["acquired"]
+        return {
+            **self._stats,
+            "wait_ms_total": round(self._stats["wait_ms_total"], 1),
+            "wait_ms_max": round(self._stats["wait_ms_max"], 1),
+            "wait_ms_avg": round(self._stats["wait_ms_total"] / acquired, 2) if acquired else 0.0,
+            "in_flight": self._in_flight,
+            "paused_for_seconds": round(max(0.0, self._paused_until - time.monotonic()), 2)
+        }
@@ -1,195 +1,293 @@
-import httpx
+import logging
 import os
 import json
+import time
 from typing import Dict, List, Optional
 from datetime import datetime
 
+from services.http_client import UpstreamClient
+from services.concurrency import as_completed_bounded
+
+logger = logging.getLogger(__name__)
+
 class ResendService:
-    def __init__(self):
+    def __init__(self, http_client: Optional[UpstreamClient] = None):
         self.api_key = os.getenv("RESEND_API_KEY")
         self.base_url = os.getenv("RESEND_URL", "https://api.resend.com")
+        self.http_client = http_client or UpstreamClient("resend")
+        # Resend accepts up to 100 messages per batch request
+        self.batch_max_size = min(int(os.getenv("RESEND_BATCH_MAX_SIZE", "100")), 100)
+        self.batch_concurrency = int(os.getenv("RESEND_BATCH_CONCURRENCY", "2"))
+        self._batch_stats = {"batches": 0, "emails_sent": 0, "emails_failed": 0, "batch_slots": 0, "send_seconds": 0.0}
         
     async def check_health(self) -> bool:
         """Check if Resend service is available"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/domains",
-                    headers={"Authorization": f"Bearer {self.api_key}"},
-                    timeout=10.0
-                )
-                return response.status_code == 200
+            response = await self.http_client.get(
+                f"{self.base_url}/domains",
+                headers={"Authorization": f"Bearer {self.api_key}"}
+            )
+            return response.status_code == 200
         except:
             return False
     
     async def test_connection(self) -> Dict:
         """Test Resend API connection"""
         try:
-            async with httpx.AsyncClient() as client:
-                # Test by getting domains (doesn't send email)
-                response = await client.get(
-                    f"{self.base_url}/domains",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    timeout=15.0
-                )
+            # Test by getting domains (doesn't send email)
+            response = await self.http_client.get(
+                f"{self.base_url}/domains",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                }
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                return {
+                    "status": "connected",
+                    "message": "Resend API is working",
+                    "domains": len(result.get("data", []))
+                }
+            else:
+                return {
+                    "status": "error",
+                    "code": response.status_code,
+                    "message": response.text
+                }
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    return {
-                        "status": "connected",
-                        "message": "Resend API is working",
-                        "domains": len(result.get("data", []))
-                    }
-                else:
-                    return {
-                        "status": "error",
-                        "code": response.status_code,
-                        "message": response.text
-                    }
-                    
         except Exception as e:
             return {
                 "status": "error",
                 "message": f"Connection failed: {str(e)}"
             }
     
+    def build_pitch_email(self, to_email: str, pitch_content: Dict, pitch_id: str) -> Dict:
+        """Render the complete pitch deck email as a message ready for delivery"""
+        return {
+            "to_email": to_email,
+            "subject": self._generate_email_subject(pitch_content),
+            "html_content": self._generate_pitch_email_html(pitch_content, pitch_id),
+            "text_content": self._generate_pitch_email_text(pitch_content),
+            "from_email": "pitchcraft@resend.dev"  # Default Resend email
+        }
+    
     async def send_pitch_email(self, to_email: str, pitch_content: Dict, pitch_id: str) -> Dict:
         """Send complete pitch deck via email"""
         try:
-            # Generate email content from pitch
-            email_subject = self._generate_email_subject(pitch_content)
-            email_html = self._generate_pitch_email_html(pitch_content, pitch_id)
-            email_text = self._generate_pitch_email_text(pitch_content)
-            
-            # Send email using Resend API
-            result = await self._send_email(
-                to_email=to_email,
-                subject=email_subject,
-                html_content=email_html,
-                text_content=email_text,
-                from_email="pitchcraft@resend.dev"  # Default Resend email
-            )
+            # Generate email content from pitch and send it using Resend API
+            result = await self._send_email(**self.build_pitch_email(to_email, pitch_content, pitch_id))
             
             return result
             
         except Exception as e:
-            print(f"Error sending pitch email: {str(e)}")
+            logger.warning("Error sending pitch email: %s", e)
             return {
                 "success": False,
                 "error": str(e),
                 "timestamp": datetime.now().isoformat()
             }
     
-    async def send_simple_pitch_email(self, to_email: str, pitch_id: str, subject: str) -> Dict:
-        """Send simple pitch notification email"""
-        try:
-            # Generate simple email content
-            html_content = f"""
-            <html>
-                <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-                    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; text-align: center;">
-                        <h1>🚀 Your PitchCraft AI Deck is Ready!</h1>
+    def build_simple_pitch_email(self, to_email: str, pitch_id: str, subject: str) -> Dict:
+        """Render the pitch notification email as a message ready for delivery"""
+        # Generate simple email content
+        html_content = f"""
+        <html>
+            <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+                <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; text-align: center;">
+                    <h1>🚀 Your PitchCraft AI Deck is Ready!</h1>
+                </div>
+                
+                <div style="padding: 20px;">
+                    <h2>Your AI-Generated Pitch Deck</h2>
+                    <p>Your professional pitch deck has been generated successfully!</p>
+                    
+                    <div style="background-color: #f8f9fa; padding: 15px; border-radius: 8px; margin: 20px 0;">
+                        <h3>Pitch ID: {pitch_id}</h3>
+                        <p><strong>Generated:</strong> {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</p>
                     </div>
                     
-                    <div style="padding: 20px;">
-                        <h2>Your AI-Generated Pitch Deck</h2>
-                        <p>Your professional pitch deck has been generated successfully!</p>
-                        
-                        <div style="background-color: #f8f9fa; padding: 15px; border-radius: 8px; margin: 20px 0;">
-                            <h3>Pitch ID: {pitch_id}</h3>
-                            <p><strong>Generated:</strong> {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</p>
-                        </div>
-                        
-                        <h3>What's Included:</h3>
-                        <ul>
-                            <li>✅ 9 Professional Slides</li>
-                            <li>✅ Market Research Insights</li>
-                            <li>✅ AI-Generated Content</li>
-                            <li>✅ Investment-Ready Format</li>
-                        </ul>
-                        
-                        <div style="text-align: center; margin: 30px 0;">
-                            <p style="color: #666;">Powered by PitchCraft AI</p>
-                        </div>
+                    <h3>What's Included:</h3>
+                    <ul>
+                        <li>✅ 9 Professional Slides</li>
+                        <li>✅ Market Research Insights</li>
+                        <li>✅ AI-Generated Content</li>
+                        <li>✅ Investment-Ready Format</li>
+                    </ul>
+                    
+                    <div style="text-align: center; margin: 30px 0;">
+                        <p style="color: #666;">Powered by PitchCraft AI</p>
                     </div>
-                </body>
-            </html>
-            """
-            
-            text_content = f"""
-            Your PitchCraft AI Deck is Ready!
-            
-            Your professional pitch deck has been generated successfully!
-            
-            Pitch ID: {pitch_id}
-            Generated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}
-            
-            What's Included:
-            - 9 Professional Slides
-            - Market Research Insights  
-            - AI-Generated Content
-            - Investment-Ready Format
-            
-            Powered by PitchCraft AI
-            """
-            
-            result = await self._send_email(
-                to_email=to_email,
-                subject=subject,
-                html_content=html_content,
-                text_content=text_content,
-                from_email="pitchcraft@resend.dev"
-            )
+                </div>
+            </body>
+        </html>
+        """
+        
+        text_content = f"""
+        Your PitchCraft AI Deck is Ready!
+        
+        Your professional pitch deck has been generated successfully!
+        
+        Pitch ID: {pitch_id}
+        Generated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}
+        
+        What's Included:
+        - 9 Professional Slides
+        - Market Research Insights  
+        - AI-Generated Content
+        - Investment-Ready Format
+        
+        Powered by PitchCraft AI
+        """
+        
+        return {
+            "to_email": to_email,
+            "subject": subject,
+            "html_content": html_content,
+            "text_content": text_content,
+            "from_email": "pitchcraft@resend.dev"
+        }
+    
+    async def send_simple_pitch_email(self, to_email: str, pitch_id: str, subject: str) -> Dict:
+        """Send simple pitch notification email"""
+        try:
+            result = await self._send_email(**self.build_simple_pitch_email(to_email, pitch_id, subject))
             
             return result
             
         except Exception as e:
-            print(f"Error sending simple email: {str(e)}")
+            logger.warning("Error sending simple email: %s", e)
             return {
                 "success": False,
                 "error": str(e),
                 "timestamp": datetime.now().isoformat()
             }
     
+    async def deliver(self, message: Dict) -> Dict:
+        """Send a message produced by one of the build_* methods"""
+        return await self._send_email(**message)
+    
+    async def send_pitch_email_batch(self, recipients: List[str], pitch_content: Dict, pitch_id: str) -> Dict:
+        """Send the complete pitch deck to many recipients, rendering it once"""
+        return await self.send_batch(recipients, self.build_pitch_email(None, pitch_content, pitch_id))
+    
+    async def send_batch(self, recipients: List[str], message: Dict) -> Dict:
+        """Deliver one rendered message to many recipients through the batch endpoint"""
+        started = time.monotonic()
+        recipients = list(dict.fromkeys(recipients))
+        chunks = [recipients[i:i + self.batch_max_size] for i in range(0, len(recipients), self.batch_max_size)]
+        statuses = {}
+        
+        calls = [lambda chunk=chunk: self._send_batch_request(chunk, message) for chunk in chunks]
+        async for index, result, error in as_completed_bounded(calls, self.batch_concurrency):
+            chunk = chunks[index]
+            if error is not None:
+                result = {"success": False, "error": str(error)}
+            
+            if result["success"]:
+                for email, email_id in zip(chunk, result["ids"]):
+                    if email_id:
+                        statuses[email] = {"email": email, "status": "sent", "id": email_id}
+                    else:
+                        # Without a message id there is no evidence Resend accepted it
+                        statuses[email] = {"email": email, "status": "failed", "error": "no message id returned"}
+            else:
+                # A rejected batch is rejected as a whole by Resend
+                for email in chunk:
+                    statuses[email] = {"email": email, "status": "failed", "error": result["error"]}
+        
+        elapsed = time.monotonic() - started
+        sent = sum(1 for status in statuses.values() if status["status"] == "sent")
+        failed = len(recipients) - sent
+        
+        self._batch_stats["batches"] += len(chunks)
+        self._batch_stats["emails_sent"] += sent
+        self._batch_stats["emails_failed"] += failed
+        self._batch_stats["batch_slots"] += len(chunks) * self.batch_max_size
+        self._batch_stats["send_seconds"] += elapsed
+        
+        return {
+            "success": failed == 0,
+            "sent": sent,
+            "failed": failed,
+            "recipients": [statuses.get(email, {"email": email, "status": "failed", "error": "not sent"}) for email in recipients],
+            "batches": len(chunks),
+            "sends_per_second": round(sent / elapsed, 2) if elapsed > 0 else 0.0,
+            "batch_fill": round(len(recipients) / (len(chunks) * self.batch_max_size), 4) if chunks else 0.0,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    async def _send_batch_request(self, recipients: List[str], message: Dict) -> Dict:
+        """POST one batch of up to batch_max_size emails"""
+        response = await self.http_client.post(
+            f"{self.base_url}/emails/batch",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            },
+            json=[
+                {
+                    "from": message["from_email"],
+                    "to": [email],
+                    "subject": message["subject"],
+                    "html": message["html_content"],
+                    "text": message["text_content"]
+                }
+                for email in recipients
+            ]
+        )
+        
+        if response.status_code == 200:
+            data = response.json().get("data", [])
+            ids = [item.get("id") if isinstance(item, dict) else None for item in data[:len(recipients)]]
+            return {"success": True, "ids": ids + [None] * (len(recipients) - len(ids))}
+        return {"success": False, "error": f"API error: {response.status_code}", "status_code": response.status_code}
+    
+    def batch_stats(self) -> Dict:
+        """Throughput and batch-fill metrics for batched sends"""
+        stats = self._batch_stats
+        return {
+            **stats,
+            "sends_per_second": round(stats["emails_sent"] / stats["send_seconds"], 2) if stats["send_seconds"] else 0.0,
+            "batch_fill_ratio": round((stats["emails_sent"] + stats["emails_failed"]) / stats["batch_slots"], 4) if stats["batch_slots"] else 0.0
+        }
+    
     async def _send_email(self, to_email: str, subject: str, html_content: str, text_content: str, from_email: str = "pitchcraft@resend.dev") -> Dict:
         """Send email using Resend API"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/emails",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "from": from_email,
-                        "to": [to_email],
-                        "subject": subject,
-                        "html": html_content,
-                        "text": text_content
-                    },
-                    timeout=30.0
-                )
+            response = await self.http_client.post(
+                f"{self.base_url}/emails",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "from": from_email,
+                    "to": [to_email],
+                    "subject": subject,
+                    "html": html_content,
+                    "text": text_content
+                }
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                return {
+                    "success": True,
+                    "id": result.get("id"),
+                    "message": f"Email sent successfully to {to_email}",
+                    "timestamp": datetime.now().isoformat()
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": f"API error: {response.status_code}",
+                    "status_code": response.status_code,
+                    "message": response.text,
+                    "timestamp": datetime.now().isoformat()
+                }
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    return {
-                        "success": True,
-                        "id": result.get("id"),
-                        "message": f"Email sent successfully to {to_email}",
-                        "timestamp": datetime.now().isoformat()
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": f"API error: {response.status_code}",
-                        "message": response.text,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
         except Exception as e:
             return {
                 "success": False,
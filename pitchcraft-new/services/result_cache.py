@@ -0,0 +1,117 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(value: Any, ignore_keys: Iterable[str] = ()) -> str:
+    """Stable hash of a JSON-like value, skipping top-level keys such as timestamps"""
+    if isinstance(value, dict):
+        ignored = set(ignore_keys)
+        value = {key: item for key, item in value.items() if key not in ignored}
+    payload = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """In-memory TTL cache with a stale-while-revalidate window.
+
+    Entries younger than `ttl` are served as fresh hits. Entries past `ttl` but
+    within `ttl + stale_ttl` are served immediately while one background refresh
+    replaces them. Older entries are misses and are loaded inline. The cache
+    holds at most `max_entries`, evicting the least recently used first.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None,
+        max_entries: Optional[int] = None
+    ):
+        self.name = name
+        self.ttl = ttl if ttl is not None else float(os.getenv("RESEARCH_CACHE_TTL", "3600"))
+        self.stale_ttl = stale_ttl if stale_ttl is not None else float(os.getenv("RESEARCH_CACHE_STALE_TTL", "21600"))
+        self.max_entries = max_entries or int(os.getenv("RESEARCH_CACHE_MAX_ENTRIES", "1000"))
+
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._refreshing: Set[Hashable] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats = {"fresh_hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0, "evictions": 0}
+
+    def _store(self, key: Hashable, value: Any):
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        load: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] = lambda value: True
+    ) -> Any:
+        """Return the cached value for `key`, loading it with `load` when missing or expired.
+
+        Results rejected by `cacheable` (e.g. fallback data) are returned but not stored.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age <= self.ttl:
+                self._entries.move_to_end(key)
+                self._stats["fresh_hits"] += 1
+                return value
+            if age <= self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self._stats["stale_hits"] += 1
+                self._refresh(key, load, cacheable)
+                return value
+
+        self._stats["misses"] += 1
+        value = await load()
+        if cacheable(value):
+            self._store(key, value)
+        return value
+
+    def _refresh(self, key: Hashable, load: Callable[[], Awaitable[Any]], cacheable: Callable[[Any], bool]):
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                value = await load()
+                if cacheable(value):
+                    self._store(key, value)
+                    self._stats["refreshes"] += 1
+                else:
+                    self._stats["refresh_errors"] += 1
+            except Exception as e:
+                self._stats["refresh_errors"] += 1
+                logger.warning("⚠️ Background refresh for %s failed: %s", self.name, e)
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def stats(self) -> Dict:
+        hits = self._stats["fresh_hits"] + self._stats["stale_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "refreshing": len(self._refreshing)
+        }
@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+def normalize_key(*parts: Any) -> Tuple:
+    """Request key that ignores case and whitespace differences in text fields"""
+    return tuple(" ".join(part.split()).casefold() if isinstance(part, str) else part for part in parts)
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one execution.
+
+    The first caller for a key runs `fn`; callers that arrive with the same key
+    while it is in flight await the same result instead of starting their own.
+    The shared execution runs as its own task, so a caller that disconnects does
+    not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Tuple[str, Hashable], asyncio.Task] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    async def do(self, group: str, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        stats = self._stats.setdefault(group, {"executions": 0, "coalesced": 0})
+        flight_key = (group, key)
+        task = self._in_flight.get(flight_key)
+        if task is None:
+            stats["executions"] += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[flight_key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(flight_key, None))
+        else:
+            stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict:
+        groups = {}
+        for group, stats in self._stats.items():
+            requests = stats["executions"] + stats["coalesced"]
+            groups[group] = {
+                **stats,
+                "requests": requests,
+                # Every coalesced request is one pipeline run (and its upstream calls) saved
+                "saved_ratio": round(stats["coalesced"] / requests, 4) if requests else 0.0
+            }
+        return {"groups": groups, "in_flight": len(self._in_flight)}
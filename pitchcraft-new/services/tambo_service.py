@@ -1,50 +1,61 @@
-import httpx
+import logging
 import os
 import json
 from typing import Dict, List, Optional
 from datetime import datetime
 
+from services.http_client import UpstreamClient
+from services.hedging import build_hedger
+from services.metrics import record_fallback
+from services.result_cache import ResultCache, fingerprint
+from services.single_flight import normalize_key
+
+logger = logging.getLogger(__name__)
+
 class TamboService:
-    def __init__(self):
+    def __init__(self, http_client: Optional[UpstreamClient] = None, analysis_cache: Optional[ResultCache] = None):
         self.api_key = os.getenv("TAMBO_AI_API_KEY")
         self.base_url = "https://api.tambo.ai"  # Default Tambo API URL
+        self.http_client = http_client or UpstreamClient("tambo_ai")
+        # Market analysis keyed on the idea and the research content (timestamps ignored)
+        self.analysis_cache = analysis_cache or ResultCache("tambo_market_analysis")
+        # Slow tail responses get a second, identical request after the rolling p90
+        self.analysis_hedger = build_hedger("tambo_ai", "analyze_market_research")
+        self.pitch_hedger = build_hedger("tambo_ai", "generate_pitch_deck")
         
     async def check_health(self) -> bool:
         """Check if Tambo AI service is available"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/health",
-                    headers={"Authorization": f"Bearer {self.api_key}"},
-                    timeout=5.0
-                )
-                return response.status_code == 200
+            response = await self.http_client.get(
+                f"{self.base_url}/health",
+                headers={"Authorization": f"Bearer {self.api_key}"}
+            )
+            return response.status_code == 200
         except:
             return False
     
     async def test_connection(self) -> Dict:
         """Test Tambo AI API connection with graceful fallback"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "tambo-chat",
-                        "messages": [{"role": "user", "content": "Test"}],
-                        "max_tokens": 10
-                    },
-                    timeout=10.0
-                )
+            response = await self.http_client.post(
+                f"{self.base_url}/v1/chat/completions",
+                operation="test_connection",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": "tambo-chat",
+                    "messages": [{"role": "user", "content": "Test"}],
+                    "max_tokens": 10
+                }
+            )
+            
+            if response.status_code == 200:
+                return {"status": "connected", "service": "tambo_ai"}
+            else:
+                return {"status": "api_error", "fallback": "available"}
                 
-                if response.status_code == 200:
-                    return {"status": "connected", "service": "tambo_ai"}
-                else:
-                    return {"status": "api_error", "fallback": "available"}
-                    
         except Exception as e:
             return {
                 "status": "connection_failed",
@@ -53,14 +64,22 @@ class TamboService:
             }
     
     async def analyze_market_research(self, idea: str, research_data: Dict) -> Dict:
-        """Analyze market research with immediate fallback"""
+        """Analyze market research with immediate fallback, served from the analysis cache when possible"""
+        return await self.analysis_cache.get_or_load(
+            (normalize_key(idea), fingerprint(research_data, ignore_keys=("researched_at", "generated_at"))),
+            lambda: self._analyze_market_research(idea, research_data),
+            cacheable=lambda analysis: analysis.get("data_source") == "tambo_ai"
+        )
+    
+    async def _analyze_market_research(self, idea: str, research_data: Dict) -> Dict:
         try:
             # Try real API call first
             prompt = f"Analyze startup idea: {idea}. Market data: {json.dumps(research_data, indent=2)[:500]}"
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
+            response = await self.analysis_hedger.run(
+                lambda: self.http_client.post(
                     f"{self.base_url}/v1/chat/completions",
+                    operation="analyze_market_research",
                     headers={
                         "Authorization": f"Bearer {self.api_key}",
                         "Content-Type": "application/json"
@@ -70,35 +89,44 @@ class TamboService:
                         "messages": [{"role": "user", "content": prompt}],
                         "max_tokens": 500,
                         "temperature": 0.7
-                    },
-                    timeout=15.0
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    insights_text = result.get("choices", [{}])[0].get("message", {}).get("content", "")
-                    
-                    return {
-                        "analysis": insights_text,
-                        "data_source": "tambo_ai",
-                        "generated_at": datetime.now().isoformat()
                     }
-                    
+                ),
+                is_success=lambda response: response.status_code == 200
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                insights_text = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+                
+                return {
+                    "analysis": insights_text,
+                    "data_source": "tambo_ai",
+                    "generated_at": datetime.now().isoformat()
+                }
+                
         except Exception as e:
-            print(f"Tambo AI unavailable, using fallback: {str(e)}")
+            logger.warning("Tambo AI unavailable, using fallback: %s", e)
         
         # Always return fallback analysis
+        record_fallback("tambo_ai", "analyze_market_research")
         return self._generate_fallback_insights(idea, research_data)
     
+    def hedge_stats(self) -> Dict:
+        return {
+            "analyze_market_research": self.analysis_hedger.stats(),
+            "generate_pitch_deck": self.pitch_hedger.stats()
+        }
+    
     async def generate_pitch_deck(self, idea: str, research_data: Dict) -> Dict:
         """Generate pitch deck with immediate fallback"""
         try:
             # Attempt real API call
             prompt = f"Create 9-slide pitch deck for: {idea}"
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
+            response = await self.pitch_hedger.run(
+                lambda: self.http_client.post(
                     f"{self.base_url}/v1/chat/completions",
+                    operation="generate_pitch_deck",
                     headers={
                         "Authorization": f"Bearer {self.api_key}",
                         "Content-Type": "application/json"
@@ -108,21 +136,23 @@ class TamboService:
                         "messages": [{"role": "user", "content": prompt}],
                         "max_tokens": 1500,
                         "temperature": 0.7
-                    },
-                    timeout=20.0
-                )
+                    }
+                ),
+                is_success=lambda response: response.status_code == 200
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+                
+                # Try to structure the response
+                return self._structure_ai_response(content, idea)
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
-                    
-                    # Try to structure the response
-                    return self._structure_ai_response(content, idea)
-                    
         except Exception as e:
-            print(f"Tambo AI generation failed, using fallback: {str(e)}")
+            logger.warning("Tambo AI generation failed, using fallback: %s", e)
         
         # Always return fallback pitch deck
+        record_fallback("tambo_ai", "generate_pitch_deck")
         return self._generate_fallback_pitch(idea, research_data)
     
     def _structure_ai_response(self, content: str, idea: str) -> Dict:
@@ -0,0 +1,308 @@
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# The span the running task is inside of; asyncio tasks inherit it from their creator,
+# so stages, fan-out calls and upstream requests nest under the request that started them
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+# OTLP span kinds and status codes
+_KINDS = {"internal": 1, "server": 2, "client": 3}
+_STATUS_CODES = {"unset": 0, "ok": 1, "error": 2}
+
+
+class _Trace:
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List["Span"] = []
+        self.finished = False
+
+
+class Span:
+    """One timed operation in a trace; use as a context manager"""
+
+    def __init__(self, tracer: "Tracer", trace: _Trace, name: str, parent: Optional["Span"], kind: str, attributes: Dict):
+        self.tracer = tracer
+        self.trace = trace
+        self.name = name
+        self.kind = kind
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = {key: value for key, value in attributes.items() if value is not None}
+        self.status = "unset"
+        self.status_message: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self._token = None
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return round((end - self.start_ns) / 1e6, 2)
+
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_error(self, message: str):
+        self.status = "error"
+        self.status_message = message
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is asyncio.CancelledError:
+            self.set_error("cancelled")
+        elif exc is not None:
+            self.set_error(str(exc) or exc_type.__name__)
+        elif self.status == "unset":
+            self.status = "ok"
+        _current_span.reset(self._token)
+        self.end_ns = time.time_ns()
+        self.tracer._finish(self)
+        return False
+
+
+class _NoopSpan:
+    """Stands in for spans of unsampled requests so instrumented code costs almost nothing"""
+
+    trace_id = None
+    span_id = None
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_error(self, message: str):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_value(value: Any) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Tracer:
+    """In-process tracer with head sampling and a local OTLP/JSON-lines exporter.
+
+    `trace()` starts a root span for a request, sampled with probability
+    `sample_rate`; `span()` opens a child of whatever span is current and is a
+    no-op outside a sampled trace. When the root span ends the whole trace is
+    handed to a background writer thread, which appends it to `export_path` as
+    one line in the OTLP JSON format (what the OpenTelemetry collector's file
+    exporter writes), and the most recent `recent` traces are kept in memory
+    for `get_trace()`. Traces are dropped rather than queued without bound if
+    the writer falls behind.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.1,
+        export_path: Optional[str] = None,
+        recent: int = 100,
+        service_name: str = "pitchcraft",
+        queue_size: int = 1000
+    ):
+        self.sample_rate = sample_rate
+        self.export_path = export_path
+        self.recent = recent
+        self.service_name = service_name
+
+        self._recent: "OrderedDict[str, List[Span]]" = OrderedDict()
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {"traces": 0, "sampled": 0, "spans": 0, "exported": 0, "export_errors": 0, "export_dropped": 0}
+
+    def trace(self, name: str, **attributes):
+        """Start a root span for a request, or a no-op span if it is not sampled"""
+        self._stats["traces"] += 1
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return NOOP_SPAN
+        self._stats["sampled"] += 1
+        return Span(self, _Trace(os.urandom(16).hex()), name, None, "server", attributes)
+
+    def span(self, name: str, kind: str = "internal", **attributes):
+        """Start a child of the current span, or a no-op span outside a sampled trace"""
+        parent = _current_span.get()
+        if parent is None:
+            return NOOP_SPAN
+        return Span(self, parent.trace, name, parent, kind, attributes)
+
+    def current_span(self):
+        return _current_span.get() or NOOP_SPAN
+
+    def _finish(self, span: Span):
+        self._stats["spans"] += 1
+        trace = span.trace
+        if trace.finished:
+            # Outlived its request (e.g. a shielded task); exported on its own
+            self._export([span])
+            return
+        trace.spans.append(span)
+        if span.parent_id is None:
+            trace.finished = True
+            self._remember(trace.trace_id, trace.spans)
+            self._export(trace.spans)
+
+    def _remember(self, trace_id: str, spans: List[Span]):
+        self._recent[trace_id] = spans
+        while len(self._recent) > self.recent:
+            self._recent.popitem(last=False)
+
+    def _export(self, spans: List[Span]):
+        """Queue finished spans for the writer thread; never blocks the caller"""
+        if not self.export_path:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="trace-exporter", daemon=True)
+                self._writer.start()
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self._stats["export_dropped"] += len(spans)
+
+    def _write_loop(self):
+        """Writer thread: serializes queued traces and appends them to the export file"""
+        trace_file = None
+        try:
+            while True:
+                spans = self._queue.get()
+                if spans is None:
+                    break
+                try:
+                    if trace_file is None:
+                        directory = os.path.dirname(self.export_path)
+                        if directory:
+                            os.makedirs(directory, exist_ok=True)
+                        trace_file = open(self.export_path, "a", encoding="utf-8")
+                    trace_file.write(json.dumps(self._to_otlp(spans), separators=(",", ":")) + "\n")
+                    if self._queue.empty():
+                        trace_file.flush()
+                    self._stats["exported"] += len(spans)
+                except OSError as e:
+                    self._stats["export_errors"] += 1
+                    logger.warning("⚠️ Trace export failed: %s", e)
+        finally:
+            if trace_file is not None:
+                trace_file.close()
+
+    def _to_otlp(self, spans: List[Span]) -> Dict:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{
+                    "scope": {"name": "pitchcraft.tracing"},
+                    "spans": [self._span_to_otlp(span) for span in spans]
+                }]
+            }]
+        }
+
+    def _span_to_otlp(self, span: Span) -> Dict:
+        status = {"code": _STATUS_CODES[span.status]}
+        if span.status_message:
+            status["message"] = span.status_message
+        otlp = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": _KINDS.get(span.kind, 1),
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+            "status": status
+        }
+        if span.parent_id:
+            otlp["parentSpanId"] = span.parent_id
+        return otlp
+
+    def get_trace(self, trace_id: str) -> Optional[Dict]:
+        """A recent trace as a nested span tree"""
+        spans = self._recent.get(trace_id)
+        if spans is None:
+            return None
+
+        nodes = {}
+        for span in sorted(spans, key=lambda span: span.start_ns):
+            node = {
+                "name": span.name,
+                "span_id": span.span_id,
+                "offset_ms": 0.0,
+                "duration_ms": span.duration_ms,
+                "status": span.status,
+                "attributes": span.attributes,
+                "children": []
+            }
+            if span.status_message:
+                node["error"] = span.status_message
+            nodes[span.span_id] = (span, node)
+
+        root = None
+        for span, node in nodes.values():
+            if span.parent_id is None:
+                root = span
+        roots = []
+        for span, node in nodes.values():
+            node["offset_ms"] = round((span.start_ns - root.start_ns) / 1e6, 2) if root else 0.0
+            parent = nodes.get(span.parent_id)
+            (parent[1]["children"] if parent else roots).append(node)
+        return {"trace_id": trace_id, "spans": roots}
+
+    def stats(self) -> Dict:
+        return {
+            **self._stats,
+            "sample_rate": self.sample_rate,
+            "export_path": self.export_path or None,
+            "recent_traces": list(self._recent.keys())[-10:]
+        }
+
+    def close(self):
+        """Write out queued traces and stop the writer thread"""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join(timeout=5.0)
+
+
+def build_tracer() -> Tracer:
+    """Create the tracer configured from the environment"""
+    return Tracer(
+        sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "0.1")),
+        export_path=os.getenv("TRACE_EXPORT_PATH", "data/traces.jsonl"),
+        recent=int(os.getenv("TRACE_RECENT", "100")),
+        queue_size=int(os.getenv("TRACE_EXPORT_QUEUE_SIZE", "1000"))
+    )
+
+
+TRACER = build_tracer()
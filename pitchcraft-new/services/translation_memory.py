@@ -0,0 +1,169 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+
+def normalize_text(text: str) -> str:
+    """Normalize source text so whitespace-only differences share one entry"""
+    return " ".join(text.split())
+
+
+class TranslationMemory:
+    """Two-tier translation cache: an in-process LRU in front of a local SQLite file.
+
+    Entries are keyed by (normalized source text, source language, target language).
+    The SQLite tier is bounded by entry count (least recently used rows go first)
+    and by age; expired rows are never returned.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        hot_size: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        max_age_seconds: Optional[float] = None
+    ):
+        self.path = path or os.getenv("TRANSLATION_MEMORY_PATH", "data/translation_memory.db")
+        self.hot_size = hot_size or int(os.getenv("TRANSLATION_MEMORY_HOT_SIZE", "2000"))
+        self.max_entries = max_entries or int(os.getenv("TRANSLATION_MEMORY_MAX_ENTRIES", "100000"))
+        self.max_age_seconds = max_age_seconds or float(os.getenv("TRANSLATION_MEMORY_MAX_AGE", str(30 * 24 * 3600)))
+
+        self._hot: "OrderedDict[Tuple[str, str, str], Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._stats = {"hot_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS translations (
+                    source_text TEXT NOT NULL,
+                    source_lang TEXT NOT NULL,
+                    target_lang TEXT NOT NULL,
+                    translated_text TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL,
+                    PRIMARY KEY (source_text, source_lang, target_lang)
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations (last_used_at)")
+            self._conn.commit()
+        return self._conn
+
+    def _remember(self, key: Tuple[str, str, str], translated: str, created_at: float):
+        self._hot[key] = (translated, created_at)
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.hot_size:
+            self._hot.popitem(last=False)
+
+    def lookup(self, texts: Iterable[str], source_lang: str, target_lang: str) -> Dict[str, str]:
+        """Return cached translations for the given texts, keyed by the original text"""
+        now = time.time()
+        found = {}
+        with self._lock:
+            disk_keys = {}
+            for text in texts:
+                key = (normalize_text(text), source_lang, target_lang)
+                entry = self._hot.get(key)
+                if entry is not None and now - entry[1] <= self.max_age_seconds:
+                    self._hot.move_to_end(key)
+                    found[text] = entry[0]
+                    self._stats["hot_hits"] += 1
+                else:
+                    disk_keys.setdefault(key, []).append(text)
+
+            if disk_keys:
+                conn = self._connect()
+                used = []
+                for key, originals in disk_keys.items():
+                    row = conn.execute(
+                        "SELECT translated_text, created_at FROM translations "
+                        "WHERE source_text = ? AND source_lang = ? AND target_lang = ? AND created_at >= ?",
+                        (*key, now - self.max_age_seconds)
+                    ).fetchone()
+                    if row is None:
+                        self._stats["misses"] += len(originals)
+                        continue
+                    self._remember(key, row[0], row[1])
+                    used.append((now, *key))
+                    for text in originals:
+                        found[text] = row[0]
+                    self._stats["disk_hits"] += len(originals)
+                if used:
+                    conn.executemany(
+                        "UPDATE translations SET last_used_at = ? "
+                        "WHERE source_text = ? AND source_lang = ? AND target_lang = ?",
+                        used
+                    )
+                    conn.commit()
+        return found
+
+    def store(self, translations: Dict[str, str], source_lang: str, target_lang: str):
+        """Save successful translations and enforce the size and age limits"""
+        if not translations:
+            return
+        now = time.time()
+        with self._lock:
+            rows = []
+            for text, translated in translations.items():
+                key = (normalize_text(text), source_lang, target_lang)
+                self._remember(key, translated, now)
+                rows.append((*key, translated, now, now))
+
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO translations "
+                "(source_text, source_lang, target_lang, translated_text, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._stats["stores"] += len(rows)
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        expired = conn.execute(
+            "DELETE FROM translations WHERE created_at < ?", (now - self.max_age_seconds,)
+        ).rowcount
+        overflow = conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM translations WHERE rowid IN "
+                "(SELECT rowid FROM translations ORDER BY last_used_at ASC LIMIT ?)",
+                (overflow,)
+            )
+        self._stats["evictions"] += max(expired, 0) + max(overflow, 0)
+
+    async def lookup_async(self, texts: Iterable[str], source_lang: str, target_lang: str) -> Dict[str, str]:
+        """Non-blocking lookup; SQLite work runs in the default executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.lookup, list(texts), source_lang, target_lang)
+
+    async def store_async(self, translations: Dict[str, str], source_lang: str, target_lang: str):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.store, dict(translations), source_lang, target_lang)
+
+    def stats(self) -> Dict:
+        hits = self._stats["hot_hits"] + self._stats["disk_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "hot_entries": len(self._hot)
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,73 @@
+import asyncio
+
+import httpx
+
+from services.adaptive_timeout import AdaptiveTimeout
+from services.circuit_breaker import CircuitBreaker
+from services.http_client import UpstreamClient
+from services.rate_limiter import RateLimiter
+
+
+def _client(latency: dict) -> UpstreamClient:
+    """UpstreamClient whose upstream answers after latency["seconds"], honouring read timeouts"""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        timeout = request.extensions["timeout"]["read"]
+        if latency["seconds"] > timeout:
+            await asyncio.sleep(timeout)
+            raise httpx.ReadTimeout("timed out", request=request)
+        await asyncio.sleep(latency["seconds"])
+        return httpx.Response(200, json={"ok": True})
+
+    return UpstreamClient(
+        "test",
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        breaker=CircuitBreaker("test", min_calls=10_000),
+        timeouts=AdaptiveTimeout("test", floor=0.02, ceiling=5.0, min_samples=20, window=100),
+        limiter=RateLimiter("test", rate=0, max_concurrency=0)
+    )
+
+
+async def _call(client: UpstreamClient, operation: str = "generate") -> bool:
+    try:
+        await client.post("https://upstream.test/v1/chat/completions", operation=operation)
+        return True
+    except httpx.TimeoutException:
+        return False
+
+
+def test_timeout_grows_when_upstream_slows_down():
+    async def scenario():
+        latency = {"seconds": 0.005}
+        client = _client(latency)
+        # Learn from fixed samples: real sleeps can overshoot into a higher bucket
+        for _ in range(50):
+            client.timeouts.record("generate", 0.005)
+        assert client.timeouts.timeout_for("generate") == 0.02
+
+        # Healthy but slower than the learned timeout: early calls time out, then it adapts
+        latency["seconds"] = 0.06
+        outcomes = [await _call(client) for _ in range(40)]
+        assert not outcomes[0]
+        assert all(outcomes[-10:])
+        assert client.timeouts.timeout_for("generate") > 0.06
+
+    asyncio.run(scenario())
+
+
+def test_operations_are_timed_separately():
+    async def scenario():
+        latency = {"seconds": 0.005}
+        client = _client(latency)
+        for _ in range(30):
+            assert await _call(client, "short")
+        latency["seconds"] = 0.05
+        for _ in range(30):
+            assert await _call(client, "long")
+
+        snapshot = client.timeouts.snapshot()
+        assert snapshot["short"]["samples"] == snapshot["long"]["samples"] == 30
+        # Observed latencies are at least the mocked ones, so only lower bounds are exact
+        assert client.timeouts.timeout_for("long") >= 0.05 * 1.5
+        assert client.timeouts.timeout_for("short") < client.timeouts.timeout_for("long")
+
+    asyncio.run(scenario())